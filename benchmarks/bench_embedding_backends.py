@@ -0,0 +1,124 @@
+"""
+Accuracy vs latency of the EMBEDDING_BACKEND options on CPU.
+
+    python benchmarks/bench_embedding_backends.py [--backends torch torch-int8 onnx onnx-int8]
+
+Each backend runs in its own process so load time and peak memory are
+measured independently. Accuracy is reported against the torch (fp32)
+backend: mean/min cosine similarity of the same text's embeddings, and the
+overlap of each query's top-10 documents (recall@10).
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import generate_corpus, generate_queries  # noqa: E402
+
+BASELINE = "torch"
+
+
+def run_backend(backend: str, docs: int, queries: int, out_path: str):
+    """Child process: load one backend, time it, save its embeddings"""
+    from service.services.embedding_model import load_sentence_transformer
+    from service.services.vector_db import EMBEDDING_MODEL_NAME
+
+    doc_texts = generate_corpus(docs)
+    query_texts = generate_queries(queries)
+
+    started = time.perf_counter()
+    model = load_sentence_transformer(EMBEDDING_MODEL_NAME, backend)
+    load_seconds = time.perf_counter() - started
+    model.encode(["warm up"], normalize_embeddings=True)
+
+    started = time.perf_counter()
+    doc_vectors = model.encode(doc_texts, batch_size=32, normalize_embeddings=True)
+    batch_seconds = time.perf_counter() - started
+
+    latencies = []
+    query_vectors = []
+    for text in query_texts:
+        started = time.perf_counter()
+        query_vectors.append(model.encode([text], normalize_embeddings=True)[0])
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    np.savez(out_path, docs=np.asarray(doc_vectors, dtype=np.float32),
+             queries=np.asarray(query_vectors, dtype=np.float32))
+    latencies.sort()
+    print(json.dumps({
+        "load_s": load_seconds,
+        "docs_per_s": docs / batch_seconds,
+        "query_p50_ms": statistics.median(latencies),
+        "query_p95_ms": latencies[int(0.95 * (len(latencies) - 1))],
+        # ru_maxrss is KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def top_k(queries: np.ndarray, docs: np.ndarray, k: int = 10) -> np.ndarray:
+    return np.argsort(-(queries @ docs.T), axis=1)[:, :k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backends", nargs="+", default=["torch", "torch-int8", "onnx", "onnx-int8"])
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_backend(args.worker, args.docs, args.queries, args.out)
+        return
+
+    backends = [BASELINE] + [b for b in args.backends if b != BASELINE]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in backends:
+            out_path = os.path.join(tmp, f"{backend}.npz")
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", backend,
+                 "--docs", str(args.docs), "--queries", str(args.queries), "--out", out_path],
+                capture_output=True, text=True
+            )
+            if proc.returncode != 0:
+                print(f"{backend}: failed\n{proc.stderr.strip().splitlines()[-1]}")
+                continue
+            stats = json.loads(proc.stdout.strip().splitlines()[-1])
+            stats["vectors"] = dict(np.load(out_path))
+            results[backend] = stats
+
+    if BASELINE not in results:
+        print(f"The {BASELINE} baseline failed; nothing to compare against")
+        return
+
+    base = results[BASELINE]["vectors"]
+    base_top = top_k(base["queries"], base["docs"])
+    header = (f"{'backend':<11} {'load s':>7} {'docs/s':>8} {'q p50 ms':>9} {'q p95 ms':>9} "
+              f"{'rss MB':>7} {'cos mean':>9} {'cos min':>8} {'recall@10':>10}")
+    print(header)
+    print("-" * len(header))
+    for backend, stats in results.items():
+        vectors = stats["vectors"]
+        cosine = np.sum(vectors["docs"] * base["docs"], axis=1)
+        top = top_k(vectors["queries"], vectors["docs"])
+        recall = np.mean([len(set(a) & set(b)) / len(b) for a, b in zip(top, base_top)])
+        print(f"{backend:<11} {stats['load_s']:>7.2f} {stats['docs_per_s']:>8.1f} "
+              f"{stats['query_p50_ms']:>9.2f} {stats['query_p95_ms']:>9.2f} {stats['peak_rss_mb']:>7.0f} "
+              f"{cosine.mean():>9.4f} {cosine.min():>8.4f} {recall:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Microbenchmark for the resume text extractors on long, multi-page CVs.
+
+    python benchmarks/bench_resume_extractors.py [--pages 1 5 20 50] [--resumes 20]
+
+Prints the mean per-resume time of each extractor and of the full
+extraction pass (ResumeText + all extractors, as process_resume runs them).
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from corpus import generate_corpus  # noqa: E402
+from service.services.resume_processor import (  # noqa: E402
+    ResumeText,
+    extract_education,
+    extract_email,
+    extract_experience,
+    extract_phone,
+    extract_skills,
+    extract_years_of_experience,
+)
+
+
+def extract_all(text: str):
+    resume = ResumeText(text)
+    extract_email(text)
+    extract_phone(text)
+    extract_skills(resume)
+    extract_experience(resume)
+    extract_education(resume)
+    extract_years_of_experience(resume)
+
+
+STAGES = [
+    ("skills", extract_skills),
+    ("experience", extract_experience),
+    ("education", extract_education),
+    ("years", extract_years_of_experience),
+    ("all extractors", extract_all),
+]
+
+
+def mean_ms(func, texts, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            func(text)
+    return (time.perf_counter() - started) / (repeat * len(texts)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 20, 50])
+    parser.add_argument("--resumes", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    header = f"{'pages':>5} {'chars':>8} " + " ".join(f"{name:>15}" for name, _ in STAGES)
+    print(header)
+    print("-" * len(header))
+    for pages in args.pages:
+        texts = generate_corpus(args.resumes, pages=pages)
+        chars = sum(len(t) for t in texts) // len(texts)
+        timings = [mean_ms(func, texts, args.repeat) for _, func in STAGES]
+        print(f"{pages:>5} {chars:>8} " + " ".join(f"{ms:>12.2f} ms" for ms in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Synthetic resume text generator shared by the benchmarks"""
+import random
+from typing import List
+
+FIRST_NAMES = ["Aarav", "Priya", "Rohan", "Ananya", "Vikram", "Sneha", "Arjun", "Kavya", "Rahul", "Meera"]
+LAST_NAMES = ["Sharma", "Iyer", "Patel", "Reddy", "Gupta", "Nair", "Singh", "Das", "Mehta", "Rao"]
+COMPANIES = ["Infosys", "Acme Corp", "Flipkart", "Zoho", "Razorpay", "Swiggy", "TCS", "Freshworks"]
+ROLES = ["Software Engineer", "Backend Developer", "Data Scientist", "DevOps Engineer",
+         "Frontend Developer", "ML Engineer", "Full Stack Developer"]
+SKILLS = ["Python", "Java", "JavaScript", "TypeScript", "Golang", "React", "Node.js", "Django",
+          "FastAPI", "PostgreSQL", "MongoDB", "Redis", "Kafka", "Docker", "Kubernetes", "AWS",
+          "GCP", "Terraform", "TensorFlow", "PyTorch", "scikit-learn", "Pandas", "GraphQL",
+          "gRPC", "Microservices", "CI/CD", "Jenkins", "Linux", "Machine Learning", "NLP"]
+DEGREES = ["B.Tech in Computer Science", "M.Tech in Data Science", "Bachelor of Science in Mathematics",
+           "Master of Science in Statistics", "MCA", "MBA"]
+INSTITUTES = ["Indian Institute of Technology Bombay", "National Institute of Technology Trichy",
+              "Anna University", "Delhi University", "St Xavier College", "University of Hyderabad"]
+FILLER = ("Designed and shipped features end to end working closely with product and design teams "
+          "improved latency and reliability of critical services mentored junior engineers and led "
+          "code reviews across the team").split()
+
+
+def _sentence(rng: random.Random, words: int = 18) -> str:
+    picked = [rng.choice(FILLER) for _ in range(words)]
+    picked[rng.randrange(words)] = rng.choice(SKILLS)
+    return " ".join(picked).capitalize() + "."
+
+
+def generate_resume(seed: int, pages: int = 1) -> str:
+    """Plain-text resume of roughly `pages` pages (~3000 characters each)"""
+    rng = random.Random(seed)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    lines = [
+        name,
+        f"{name.lower().replace(' ', '.')}{seed}@example.com | +91 98{rng.randrange(10**8):08d}",
+        "",
+        "SUMMARY",
+        f"{rng.randint(1, 15)} years of experience building software. " + _sentence(rng),
+        "",
+        "WORK EXPERIENCE",
+    ]
+    year = 2024
+    for _ in range(max(1, pages * 3)):
+        start = year - rng.randint(1, 4)
+        lines.append(f"{rng.choice(ROLES)} at {rng.choice(COMPANIES)} ({start} - {year})")
+        lines.extend(_sentence(rng) for _ in range(5))
+        lines.append("")
+        year = start
+    lines.append("PROJECTS")
+    lines.extend(_sentence(rng) for _ in range(pages * 4))
+    lines += ["", "EDUCATION"]
+    lines.append(f"{rng.choice(DEGREES)} from {rng.choice(INSTITUTES)} ({year - 4} - {year})")
+    lines += ["", "SKILLS", ", ".join(rng.sample(SKILLS, rng.randint(6, 14)))]
+    return "\n".join(lines)
+
+
+def generate_corpus(count: int, pages: int = 1, seed: int = 0) -> List[str]:
+    return [generate_resume(seed + i, pages) for i in range(count)]
+
+
+def generate_queries(count: int, seed: int = 0) -> List[str]:
+    """Recruiter-style search queries over the same vocabulary"""
+    rng = random.Random(seed)
+    return [
+        f"{rng.choice(ROLES)} with {' and '.join(rng.sample(SKILLS, rng.randint(1, 3)))}"
+        for _ in range(count)
+    ]
+
+
+def write_docx(text: str, path: str):
+    """Save a generated resume as a DOCX file, one paragraph per line"""
+    import docx
+
+    document = docx.Document()
+    for line in text.split("\n"):
+        document.add_paragraph(line)
+    document.save(path)
@@ -0,0 +1,201 @@
+"""
+In-process stand-ins for the external services, so the hot paths can be
+measured without Pinecone, MongoDB, Gemini or model downloads.
+
+- vector index: LocalVectorIndex with no path (pure in-memory NumPy)
+- MongoDB: FakeMongoClient, the subset of pymongo ProfileManager uses
+- Gemini: FakeLLM, deterministic scores after a configurable latency
+- embeddings: FakeEncoder, hashed bag-of-words vectors (or the real model)
+"""
+import copy
+import os
+import re
+import sys
+import time
+import zlib
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the score cache in memory; set before SemanticSearch reads it
+os.environ.setdefault("LLM_SCORE_CACHE_PATH", "")
+
+from service.services.profile_manager import ProfileManager  # noqa: E402
+from service.services.profile_cache import ProfileCache  # noqa: E402
+from service.services.resume_processor import (  # noqa: E402
+    ResumeText,
+    extract_education,
+    extract_email,
+    extract_experience,
+    extract_phone,
+    extract_skills,
+    extract_years_of_experience,
+)
+from service.services.semantic_search import SemanticSearch  # noqa: E402
+from service.services.vector_db import EMBEDDING_DIMENSION, VectorDB  # noqa: E402
+from service.services.vector_index import LocalVectorIndex  # noqa: E402
+
+from corpus import generate_corpus  # noqa: E402
+
+
+def _matches(doc: Dict, filter: Dict) -> bool:
+    for field, condition in filter.items():
+        value = doc.get(field)
+        if isinstance(condition, dict) and "$in" in condition:
+            if value not in condition["$in"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+def _project(doc: Dict, projection: Optional[Dict]) -> Dict:
+    doc = copy.deepcopy(doc)
+    if not projection:
+        return doc
+    included = [field for field, flag in projection.items() if flag and field != "_id"]
+    if included:
+        doc = {field: doc[field] for field in included + ["_id"] if field in doc}
+    else:
+        doc = {field: value for field, value in doc.items() if projection.get(field, 1)}
+    if not projection.get("_id", 1):
+        doc.pop("_id", None)
+    return doc
+
+
+class FakeCollection:
+    """Dict-backed collection with the pymongo calls ProfileManager makes"""
+
+    def __init__(self):
+        self.docs: List[Dict] = []
+
+    def create_index(self, *args, **kwargs):
+        return None
+
+    def find(self, filter: Optional[Dict] = None, projection: Optional[Dict] = None, **kwargs) -> Iterator[Dict]:
+        return iter([_project(doc, projection) for doc in self.docs if _matches(doc, filter or {})])
+
+    def find_one(self, filter: Optional[Dict] = None, projection: Optional[Dict] = None) -> Optional[Dict]:
+        return next(self.find(filter, projection), None)
+
+    def update_one(self, filter: Dict, update: Dict, upsert: bool = False):
+        for doc in self.docs:
+            if _matches(doc, filter):
+                doc.update(copy.deepcopy(update.get("$set", {})))
+                for field in update.get("$unset", {}):
+                    doc.pop(field, None)
+                return
+        if upsert:
+            doc = {"_id": len(self.docs), **copy.deepcopy(filter), **copy.deepcopy(update.get("$set", {}))}
+            self.docs.append(doc)
+
+    def distinct(self, field: str) -> List:
+        return list(dict.fromkeys(doc[field] for doc in self.docs if field in doc))
+
+    def count_documents(self, filter: Dict) -> int:
+        return sum(1 for doc in self.docs if _matches(doc, filter))
+
+
+class FakeDatabase:
+    def __init__(self):
+        self._collections: Dict[str, FakeCollection] = {}
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._collections.setdefault(name, FakeCollection())
+
+    def command(self, name: str):
+        return {"ok": 1}
+
+
+class FakeMongoClient:
+    def __init__(self):
+        self._databases: Dict[str, FakeDatabase] = {}
+
+    def __getattr__(self, name: str) -> FakeDatabase:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self._databases.setdefault(name, FakeDatabase())
+
+
+class FakeLLM:
+    """
+    Replaces the Gemini GenerativeModel on SemanticSearch.
+    Sleeps `latency` seconds per call (plus `per_item_latency` per extra item
+    in a batched prompt) and answers with a score derived from the prompt.
+    """
+
+    def __init__(self, latency: float = 0.2, per_item_latency: float = 0.02):
+        self.latency = latency
+        self.per_item_latency = per_item_latency
+        self.calls = 0
+
+    def generate_content(self, prompt: str, generation_config=None):
+        self.calls += 1
+        score = zlib.crc32(prompt.encode("utf-8")) % 101
+        batch = re.search(r"JSON array of (\d+) integers", prompt)
+        if batch:
+            count = int(batch.group(1))
+            time.sleep(self.latency + self.per_item_latency * (count - 1))
+            return SimpleNamespace(text=str([(score + 7 * i) % 101 for i in range(count)]))
+        time.sleep(self.latency)
+        return SimpleNamespace(text=str(score))
+
+
+class FakeEncoder:
+    """Deterministic normalized bag-of-words vectors with the model's dimension"""
+
+    backend = "fake"
+    loaded = True
+
+    def encode(self, sentences, batch_size: int = 32, normalize_embeddings: bool = True, **kwargs):
+        vectors = np.zeros((len(sentences), EMBEDDING_DIMENSION), dtype=np.float32)
+        for row, sentence in enumerate(sentences):
+            for word in re.findall(r"\w+", sentence.lower()):
+                vectors[row, zlib.crc32(word.encode("utf-8")) % EMBEDDING_DIMENSION] += 1.0
+            vectors[row, 0] += 1e-3
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def warm_up(self):
+        pass
+
+
+def extract_profile(text: str) -> Dict:
+    """process_resume's output for already extracted text"""
+    resume = ResumeText(text)
+    return {
+        "raw_text": text.strip(),
+        "email": extract_email(text),
+        "phone": extract_phone(text),
+        "skills": extract_skills(resume),
+        "experience": extract_experience(resume),
+        "education": extract_education(resume),
+        "years_of_experience": extract_years_of_experience(resume),
+    }
+
+
+def build_services(profiles: int = 1000, llm_latency: float = 0.2, real_encoder: bool = False,
+                   seed: int = 0):
+    """
+    VectorDB, ProfileManager and SemanticSearch wired to the fakes and
+    seeded with `profiles` synthetic candidates (user ids "user-<n>")
+    """
+    model = None if real_encoder else FakeEncoder()
+    vector_db = VectorDB(index=LocalVectorIndex(path=None, dimension=EMBEDDING_DIMENSION), model=model)
+    profile_manager = ProfileManager(cache=ProfileCache(), client=FakeMongoClient())
+
+    seeded = {
+        f"user-{seed + n}": extract_profile(text)
+        for n, text in enumerate(generate_corpus(profiles, seed=seed))
+    }
+    for user_id, profile in seeded.items():
+        profile_manager.create_or_update_profile(user_id, profile)
+    vector_db.upsert_candidates(seeded)
+
+    semantic_search = SemanticSearch(vector_db, profile_manager)
+    semantic_search.model = FakeLLM(latency=llm_latency)
+    return vector_db, profile_manager, semantic_search
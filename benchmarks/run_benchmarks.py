@@ -0,0 +1,151 @@
+"""
+Offline benchmarks of the service hot paths against in-process fakes.
+
+    python benchmarks/run_benchmarks.py [--profiles 1000] [--iterations 50] [--llm-latency-ms 200]
+
+Scenarios:
+  process_resume      DOCX resume -> extracted fields
+  upsert_candidate    embed + write one profile to the vector index
+  vector_search       VectorDB.search (embed query + top-20)
+  hybrid_retrieval    SemanticSearch.retrieve (BM25 + vector fusion, no LLM)
+  skill_retrieval     SemanticSearch.retrieve for pure skill queries ("kafka golang")
+  semantic_search     SemanticSearch.search (retrieval + profiles + LLM re-rank)
+  cached_search       SemanticSearch.cached_search repeating one query (result cache hits)
+  stream_first_event  SemanticSearch.search_events up to the first (vector ranked) event
+  batch_job_match     POST /api/calculate-batch-job-match with --jobs jobs
+
+Reports throughput and p50/p95/p99 latency per scenario. The LLM score
+cache is cleared before every iteration unless --warm-cache is given, so
+the re-rank path is measured rather than cache hits.
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Per-write INFO lines (and httpx request logs) would drown the report;
+# main.setup_logging() reads this when the API scenario imports it
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+logging.getLogger().setLevel(os.environ["LOG_LEVEL"])
+
+from corpus import ROLES, SKILLS, generate_corpus, generate_queries, write_docx  # noqa: E402
+from fakes import build_services, extract_profile  # noqa: E402
+
+from service.services.resume_processor import process_resume  # noqa: E402
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def measure(name: str, func: Callable[[int], None], iterations: int,
+            before: Callable[[], None] = None) -> Dict:
+    """Call func(i) `iterations` times; only the call itself is timed"""
+    latencies = []
+    for i in range(iterations):
+        if before is not None:
+            before()
+        started = time.perf_counter()
+        func(i)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return {
+        "name": name,
+        "n": iterations,
+        "ops_per_s": 1000 / statistics.mean(latencies),
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=1000, help="candidates seeded into the fakes")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--pages", type=int, default=2, help="pages per resume for process_resume")
+    parser.add_argument("--jobs", type=int, default=25, help="jobs per batch match request")
+    parser.add_argument("--llm-latency-ms", type=float, default=200)
+    parser.add_argument("--real-encoder", action="store_true",
+                        help="use the real embedding model (EMBEDDING_BACKEND) instead of FakeEncoder")
+    parser.add_argument("--warm-cache", action="store_true", help="keep LLM scores cached between iterations")
+    parser.add_argument("--only", nargs="+", help="run only these scenarios")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    vector_db, profile_manager, semantic_search = build_services(
+        profiles=args.profiles, llm_latency=args.llm_latency_ms / 1000, real_encoder=args.real_encoder
+    )
+    print(f"Seeded {args.profiles} profiles in {time.perf_counter() - started:.1f}s")
+
+    def clear_score_cache():
+        if not args.warm_cache:
+            semantic_search.score_cache.memory.clear()
+
+    rng = random.Random(0)
+    queries = generate_queries(args.iterations, seed=1)
+    skill_rng = random.Random(2)
+    skill_queries = [" ".join(skill_rng.sample(SKILLS, 2)) for _ in range(args.iterations)]
+    fresh_profiles = [extract_profile(text) for text in generate_corpus(args.iterations, seed=10 ** 6)]
+    jobs = [
+        {"job_id": f"job-{n}", "role": rng.choice(ROLES),
+         "description": "Build and run production services.",
+         "requirements": ", ".join(rng.sample(SKILLS, 4))}
+        for n in range(args.jobs)
+    ]
+
+    results = []
+    wanted = set(args.only) if args.only else None
+
+    def run(name, func, before=None):
+        if wanted is None or name in wanted:
+            results.append(measure(name, func, args.iterations, before))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for n, text in enumerate(generate_corpus(args.iterations, pages=args.pages, seed=2 * 10 ** 6)):
+            paths.append(os.path.join(tmp, f"resume-{n}.docx"))
+            write_docx(text, paths[-1])
+        run("process_resume", lambda i: process_resume(paths[i]))
+
+    run("upsert_candidate", lambda i: vector_db.upsert_candidate(f"new-{i}", fresh_profiles[i]))
+    run("vector_search", lambda i: vector_db.search(queries[i], top_k=20))
+    run("hybrid_retrieval", lambda i: semantic_search.retrieve(queries[i]))
+    run("skill_retrieval", lambda i: semantic_search.retrieve(skill_queries[i]))
+    run("semantic_search", lambda i: semantic_search.search(queries[i]), before=clear_score_cache)
+    run("cached_search", lambda i: semantic_search.cached_search(queries[0]))
+    run("stream_first_event", lambda i: next(semantic_search.search_events(queries[i])))
+
+    if wanted is None or "batch_job_match" in wanted:
+        from fastapi.testclient import TestClient
+        import main
+
+        # Without the lifespan, so the fakes replace the real services
+        main.vector_db, main.profile_manager, main.semantic_search = vector_db, profile_manager, semantic_search
+        client = TestClient(main.app)
+
+        def batch_match(i):
+            response = client.post("/api/calculate-batch-job-match",
+                                   json={"user_id": f"user-{i % args.profiles}", "jobs": jobs})
+            response.raise_for_status()
+
+        run("batch_job_match", batch_match, before=clear_score_cache)
+
+    header = f"{'scenario':<18} {'n':>5} {'ops/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['name']:<18} {r['n']:>5} {r['ops_per_s']:>9.1f} {r['p50']:>9.2f} {r['p95']:>9.2f} {r['p99']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
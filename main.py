@@ -1,8 +1,15 @@
-from fastapi import FastAPI, UploadFile, File, Depends, HTTPException, Header
+from fastapi import FastAPI, UploadFile, File, Depends, HTTPException, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict
+from contextlib import asynccontextmanager
+import asyncio
+import json
+import logging
 import os
+import threading
+import time
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -10,15 +17,143 @@ import cloudinary
 import cloudinary.uploader
 
 from service.services.auth import verify_token
-from service.services.resume_processor import process_resume
-from service.services.vector_db import VectorDB
+from service.services.executors import run_blocking, run_cpu_bound, shutdown_pools
+from service.services.ingestion import IngestionQueue
+from service.services.logs import setup_logging, stop_logging
+from service.services import metrics
+from service.services.resume_processor import EXTRACTOR_VERSION, process_resume
+from service.services.readiness import ReadinessTracker
+from service.services.vector_db import LEXICAL_PROFILE_FIELDS, VectorDB, create_embedding_model, create_vector_index
 from service.services.profile_manager import ProfileManager
 from service.services.semantic_search import SemanticSearch
+from service.services.search_filters import build_metadata_filter
+from service.services.uploads import (
+    UploadTooLarge, declared_size_too_large, file_sha256, max_upload_bytes, spool_upload, unique_upload_path
+)
 
 
 load_dotenv()
+setup_logging()
+logger = logging.getLogger("service.api")
+
+
+# Services are built by the lifespan's startup task; until then they are None
+# and API requests get a 503 (see require_services)
+vector_db: Optional[VectorDB] = None
+profile_manager: Optional[ProfileManager] = None
+semantic_search: Optional[SemanticSearch] = None
+readiness = ReadinessTracker()
+
+
+async def init_services():
+    """Build the services, initializing independent dependencies concurrently"""
+    global vector_db, profile_manager, semantic_search
+    timeout = float(os.getenv("STARTUP_TIMEOUT_SECONDS", "60"))
+
+    def connect_mongo() -> ProfileManager:
+        manager = ProfileManager()
+        manager.ping()
+        try:
+            manager.ensure_indexes()
+        except Exception as e:
+            logger.warning("Could not create profile indexes: %s", e)
+        return manager
+
+    warm_up = os.getenv("EMBEDDING_WARMUP", "true").lower() == "true"
+    # Everything is registered up front so /api/ready never reports an empty (ready) set
+    readiness.add("embedding_model", backend=os.getenv("EMBEDDING_BACKEND", "torch").lower())
+    readiness.add("mongo")
+    readiness.add("vector_index", backend=os.getenv("VECTOR_DB_BACKEND", "pinecone").lower())
+    if warm_up:
+        # Optional: a failed warm-up is reported as degraded and the model loads on first use
+        readiness.add("embedding_warm_up", required=False)
+    readiness.add("lexical_index")
+    readiness.add("semantic_search")
+
+    # Failures are recorded for /api/ready; the API keeps answering 503
+    try:
+        embedding_model = await readiness.run("embedding_model", create_embedding_model, timeout=timeout)
+    except Exception:
+        return
+    steps = [
+        readiness.run("mongo", connect_mongo, timeout=timeout),
+        readiness.run("vector_index", create_vector_index, timeout=timeout),
+    ]
+    if warm_up:
+        steps.append(readiness.run("embedding_warm_up", embedding_model.warm_up, timeout=timeout))
+
+    manager, index, *_ = await asyncio.gather(*steps, return_exceptions=True)
+    if isinstance(manager, BaseException) or isinstance(index, BaseException):
+        return
+    db = VectorDB(index, embedding_model)
+    try:
+        await readiness.run(
+            "lexical_index", db.load_lexical_index, manager.iter_profiles(LEXICAL_PROFILE_FIELDS), timeout=timeout
+        )
+        search = await readiness.run("semantic_search", SemanticSearch, db, manager, timeout=timeout)
+    except Exception:
+        return
+
+    profile_manager = manager
+    vector_db = search.vector_db
+    semantic_search = search
+    if ingestion_queue is not None:
+        await ingestion_queue.start()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Initialization runs in the background so the server (and /api/health)
+    # comes up immediately; /api/ready reports progress
+    init_task = asyncio.create_task(init_services())
+    yield
+    init_task.cancel()
+    if ingestion_queue is not None:
+        await ingestion_queue.stop()
+    shutdown_pools()
+    stop_logging()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """
+    Refuse oversized resume uploads from Content-Length, before Starlette
+    receives and spools the multipart body; spool_upload still enforces the
+    limit for uploads without one
+    """
+    if request.method == "POST" and request.url.path == "/api/upload-resume":
+        max_bytes = max_upload_bytes()
+        if declared_size_too_large(request.headers.get("content-length"), max_bytes):
+            return JSONResponse(status_code=413, content={"detail": str(UploadTooLarge(max_bytes))})
+    return await call_next(request)
+
+
+@app.middleware("http")
+async def require_services(request: Request, call_next):
+    """API calls other than health/readiness are refused until startup has finished"""
+    path = request.url.path
+    if semantic_search is None and path.startswith("/api/") and path not in ("/api/health", "/api/ready"):
+        return JSONResponse(status_code=503, content={"detail": "Service is starting"})
+    return await call_next(request)
+
+
+@app.middleware("http")
+async def record_timings(request: Request, call_next):
+    """Request latency histogram plus a Server-Timing header with per-stage durations"""
+    spans = metrics.start_request()
+    started = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - started
+    route = request.scope.get("route")
+    metrics.REQUEST_SECONDS.labels(
+        request.method, route.path if route is not None else "unmatched", str(response.status_code)
+    ).observe(elapsed)
+    response.headers["Server-Timing"] = metrics.server_timing(spans, elapsed)
+    return response
 
-app = FastAPI()
 
 # --- Cloudinary Configuration ---
 cloud_name = os.getenv("CLOUDINARY_CLOUD_NAME")
@@ -58,12 +193,6 @@ TEMP_DIR = Path("temp")
 TEMP_DIR.mkdir(exist_ok=True)
 
 
-# Initialize services
-vector_db = VectorDB()
-profile_manager = ProfileManager()
-semantic_search = SemanticSearch(vector_db)
-
-
 # --- Pydantic Models ---
 class JobData(BaseModel):
     job_id: str
@@ -74,10 +203,12 @@ class JobData(BaseModel):
 class BatchMatchRequest(BaseModel):
     user_id: Optional[str] = None
     jobs: List[JobData]
+    refine: bool = True # False returns embedding scores only, without LLM calls
 
 class BatchMatchResponseItem(BaseModel):
     job_id: str
     matchScore: int
+    scoreSource: Optional[str] = None # "embedding" or "llm"
 
 class ProfileUpdate(BaseModel):
     skills: Optional[str] = None
@@ -86,6 +217,11 @@ class ProfileUpdate(BaseModel):
 
 class SearchQuery(BaseModel):
     query: str
+    # Optional filters, applied by the vector index before ranking
+    min_years: Optional[float] = None
+    max_years: Optional[float] = None
+    skills: Optional[List[str]] = None # every one is required
+    education: Optional[str] = None # minimum level: high_school, associate, bachelor, master, phd
 
 
 # --- API Endpoints ---
@@ -94,74 +230,159 @@ async def health():
     return {"status": "ok"}
 
 
-@app.post("/api/upload-resume")
-async def upload_resume(
-    resume: UploadFile = File(...),
-    authorization: str = Header(None)
-):
-    print("\n--- Received request to /api/upload-resume ---")
-    user_id = verify_token(authorization)
-    if not user_id:
-        print("[DEBUG] Unauthorized access detected.")
-        raise HTTPException(status_code=401, detail="Unauthorized")
+@app.get("/metrics")
+async def prometheus_metrics():
+    return Response(content=metrics.latest(), media_type=metrics.CONTENT_TYPE)
 
-    print(f"[DEBUG] User authenticated: {user_id}")
 
-    file_path = TEMP_DIR / resume.filename
-    print(f"[DEBUG] Temporary file path: {file_path}")
+@app.get("/api/ready")
+async def ready():
+    """Per-dependency startup status and init timings; 503 until everything is ready"""
+    report = readiness.report()
+    return JSONResponse(status_code=200 if report["status"] == "ready" else 503, content=report)
 
-    try:
-        # Save the file locally first
-        with open(file_path, "wb") as f:
-            content = await resume.read() 
-            f.write(content)
-        print(f"[DEBUG] File '{resume.filename}' saved locally.")
-
-        # Upload to Cloudinary using SIGNED upload (no preset needed)
-        print("[DEBUG] Attempting to upload to Cloudinary...")
-        upload_result = cloudinary.uploader.upload(
-            str(file_path),
+
+async def upload_resume_file(file_path: str, filename: Optional[str] = None) -> str:
+    """Upload a saved resume to Cloudinary and return its secure_url"""
+    # Upload to Cloudinary using SIGNED upload (no preset needed)
+    logger.debug("Uploading %s to Cloudinary", file_path)
+    upload_options = {}
+    if filename:
+        # Local files have generated names; keep the user's file name
+        upload_options["filename_override"] = Path(filename).name
+    with metrics.span("cloudinary.upload"):
+        upload_result = await run_blocking(
+            cloudinary.uploader.upload,
+            file_path,
             resource_type="raw",        # Important for PDFs
             folder="resumes",           # Upload to 'resumes' folder
             use_filename=True,          # Use original filename
             unique_filename=True,       # Add unique identifier to prevent overwrites
-            overwrite=False             # Don't overwrite existing files
+            overwrite=False,            # Don't overwrite existing files
+            **upload_options
         )
 
-        print("\n--- Cloudinary Upload Result ---")
-        print(upload_result)
-        print("--------------------------------\n")
+    secure_url = upload_result.get("secure_url")
+
+    if not secure_url:
+        logger.error("'secure_url' not found in Cloudinary response (public_id=%s)", upload_result.get("public_id"))
+        raise RuntimeError("Could not upload resume to cloud storage.")
+
+    logger.debug("Cloudinary upload done: %s (%s bytes)", secure_url, upload_result.get("bytes"))
+    return secure_url
+
+
+async def extract_resume(file_path: str, content_hash: str) -> Dict:
+    """Parsed resume fields, reused across users for byte-identical files"""
+    extracted_data = await run_blocking(profile_manager.get_extraction, content_hash, EXTRACTOR_VERSION)
+    if extracted_data is not None:
+        logger.debug("Identical resume already parsed, reusing extraction")
+        return extracted_data
+
+    # Process resume text (CPU-bound, runs on the CPU pool)
+    extracted_data = await run_cpu_bound(process_resume, file_path)
+    await run_blocking(profile_manager.save_extraction, content_hash, EXTRACTOR_VERSION, extracted_data)
+    logger.debug("Resume processed")
+    return extracted_data
+
 
-        secure_url = upload_result.get("secure_url")
+async def ingest_resume(user_id: str, file_path: str, filename: Optional[str] = None,
+                        content_hash: Optional[str] = None) -> Dict:
+    """Cloudinary upload + parse/embed -> vector DB -> MongoDB for a saved resume file"""
+    if content_hash is None:
+        content_hash = await run_blocking(file_sha256, file_path)
 
-        if not secure_url:
-            print("[DEBUG] ERROR: 'secure_url' not found in Cloudinary response.")
-            raise HTTPException(status_code=500, detail="Could not upload resume to cloud storage.")
+    # Re-upload of the user's current resume: everything is already stored
+    profile = await run_blocking(profile_manager.get_profile, user_id)
+    if (profile and profile.get("resume_url")
+            and profile.get("resume_sha256") == content_hash
+            and profile.get("extractor_version") == EXTRACTOR_VERSION):
+        logger.info("Resume for %s unchanged, returning stored profile", user_id)
+        return profile
+
+    # The Cloudinary round-trip overlaps with parsing and embedding
+    upload_task = asyncio.create_task(upload_resume_file(file_path, filename))
+    try:
+        extracted_data = await extract_resume(file_path, content_hash)
+        vectors = await run_blocking(vector_db.build_candidate_vectors, {user_id: extracted_data})
+    except BaseException:
+        # Let the upload finish with the file before the caller deletes it
+        await asyncio.gather(upload_task, return_exceptions=True)
+        raise
+
+    # Nothing is stored unless the upload succeeded
+    extracted_data["resume_url"] = await upload_task
+    extracted_data["resume_sha256"] = content_hash
+    extracted_data["extractor_version"] = EXTRACTOR_VERSION
+
+    # Store in vector DB
+    await run_blocking(vector_db.upsert_vectors, vectors)
+    logger.debug("Candidate %s stored in vector DB", user_id)
+
+    # Save profile to MongoDB
+    await run_blocking(profile_manager.create_or_update_profile, user_id, extracted_data)
+    await run_blocking(semantic_search.score_cache.invalidate_user, user_id)
+    logger.info("Resume ingested for %s", user_id)
+
+    return extracted_data
+
+
+# Optional background ingestion: RESUME_INGEST_MODE=queue makes the upload
+# endpoint return a job id immediately and caps concurrent ingestions.
+ingestion_queue = None
+if os.getenv("RESUME_INGEST_MODE", "sync").lower() == "queue":
+    ingestion_queue = IngestionQueue(
+        ingest_resume,
+        spool_dir=str(TEMP_DIR / "ingest"),
+        db_path=os.getenv("INGEST_QUEUE_DB", str(TEMP_DIR / "ingest" / "jobs.sqlite3")),
+        workers=int(os.getenv("INGEST_WORKERS", "2")),
+    )
+
+
+@app.post("/api/upload-resume")
+async def upload_resume(
+    resume: UploadFile = File(...),
+    authorization: str = Header(None)
+):
+    user_id = verify_token(authorization)
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
 
-        resume_url_to_save = secure_url
-        print(f"[SERVICE-DEBUG] Using original secure_url: {resume_url_to_save}")
+    if ingestion_queue is not None:
+        job_id = ingestion_queue.new_job_id()
+        spool_path = ingestion_queue.spool_path(job_id, resume.filename)
+        try:
+            await spool_upload(resume, spool_path, max_upload_bytes())
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        await ingestion_queue.submit(job_id, user_id, spool_path, resume.filename)
+        logger.info("Resume from %s queued for ingestion as job %s", user_id, job_id)
+        return JSONResponse(
+            status_code=202,
+            content={
+                "message": "Resume queued for processing",
+                "job_id": job_id,
+                "status": "queued",
+                "status_url": f"/api/upload-resume/{job_id}",
+            },
+        )
 
-        # Process resume text
-        extracted_data = process_resume(str(file_path))
-        extracted_data["resume_url"] = resume_url_to_save
-        print("[DEBUG] Resume processed successfully.")
+    file_path = unique_upload_path(TEMP_DIR, resume.filename)
 
-        # Store in vector DB
-        vector_db.upsert_candidate(user_id, extracted_data)
-        print("[DEBUG] Candidate data upserted to vector DB.")
+    try:
+        # Stream the file to disk first
+        size, content_hash = await spool_upload(resume, file_path, max_upload_bytes())
+        logger.debug("Saved %r to %s (%d bytes)", resume.filename, file_path, size)
 
-        # Save profile to MongoDB
-        profile_manager.create_or_update_profile(user_id, extracted_data)
-        print("[DEBUG] Profile saved to MongoDB.")
+        extracted_data = await ingest_resume(user_id, str(file_path), resume.filename, content_hash)
 
-        print("--- Resume upload process completed successfully ---\n")
         return {"message": "Resume processed successfully", "data": extracted_data}
 
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
     except Exception as e:
-        print(f"\n--- AN ERROR OCCURRED ---")
-        print(f"Exception Type: {type(e).__name__}")
-        print(f"Error Details: {e}")
-        print("--------------------------\n")
+        logger.exception("Error processing resume for %s", user_id)
         raise HTTPException(status_code=500, detail=f"Error processing resume: {str(e)}")
 
     finally:
@@ -169,9 +390,35 @@ async def upload_resume(
         try:
             if file_path.exists():
                 file_path.unlink()
-                print(f"[DEBUG] Temporary file '{file_path}' deleted.")
         except Exception as e:
-            print(f"[DEBUG] Error deleting temporary file: {e}")
+            logger.warning("Error deleting temporary file %s: %s", file_path, e)
+
+
+@app.get("/api/upload-resume/{job_id}")
+async def upload_resume_status(
+    job_id: str,
+    authorization: str = Header(None)
+):
+    """Status of a queued resume ingestion job"""
+    user_id = verify_token(authorization)
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    if ingestion_queue is None:
+        raise HTTPException(status_code=404, detail="Resume ingestion queue is not enabled")
+
+    job = await run_blocking(ingestion_queue.get, job_id)
+    if not job or job["user_id"] != user_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "error": job["error"],
+        "data": job["result"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
 
 
 @app.get("/api/profile")
@@ -180,7 +427,7 @@ async def get_profile(authorization: str = Header(None)):
     if not user_id:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    profile = profile_manager.get_profile(user_id)
+    profile = await run_blocking(profile_manager.get_profile, user_id)
     return {"profile": profile}
 
 
@@ -194,7 +441,7 @@ async def update_profile(
         raise HTTPException(status_code=401, detail="Unauthorized")
 
     # Fetch existing profile to merge updates correctly
-    existing_profile = profile_manager.get_profile(user_id)
+    existing_profile = await run_blocking(profile_manager.get_profile, user_id)
     if not existing_profile:
         # Handle case where profile doesn't exist yet, maybe create it?
         # For now, let's assume update only happens if profile exists
@@ -207,15 +454,16 @@ async def update_profile(
         updated_data_for_mongo.update(update_dict)
 
 
-    updated_profile_mongo = profile_manager.update_profile(user_id, updated_data_for_mongo)
+    updated_profile_mongo = await run_blocking(profile_manager.update_profile, user_id, updated_data_for_mongo)
+    await run_blocking(semantic_search.score_cache.invalidate_user, user_id)
 
-    # Re-fetch the fully updated profile data for VectorDB upsert
-    full_updated_profile = profile_manager.get_profile(user_id)
+    # update_profile returns the fully updated profile data for VectorDB upsert
+    full_updated_profile = updated_profile_mongo
     if full_updated_profile:
       # Update vector DB with the complete, merged profile data
-      vector_db.upsert_candidate(user_id, full_updated_profile)
+      await run_blocking(vector_db.upsert_candidate, user_id, full_updated_profile)
     else:
-      print(f"[WARN] Profile {user_id} not found after update for VectorDB upsert.")
+      logger.warning("Profile %s not found after update for VectorDB upsert", user_id)
 
 
     return {"message": "Profile updated successfully", "profile": full_updated_profile}
@@ -230,8 +478,68 @@ async def semantic_search_endpoint(
     if not user_id:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    results = semantic_search.search(query.query)
-    return {"results": results}
+    try:
+        metadata_filter = build_metadata_filter(query.min_years, query.max_years, query.skills, query.education)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    results, cache_age = await run_blocking(semantic_search.cached_search, query.query, metadata_filter)
+    return {
+        "results": results,
+        "cache_hit": cache_age is not None,
+        "cache_age_seconds": round(cache_age, 1) if cache_age is not None else None,
+    }
+
+
+@app.post("/api/semantic-search/stream")
+async def semantic_search_stream_endpoint(
+    query: SearchQuery,
+    request: Request,
+    authorization: str = Header(None)
+):
+    """
+    Same search as /api/semantic-search, streamed as it progresses:
+    "candidates" (vector ranked), a "score" per LLM score, then "done".
+    NDJSON by default; Server-Sent Events when the client accepts text/event-stream.
+    """
+    user_id = verify_token(authorization)
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    try:
+        metadata_filter = build_metadata_filter(query.min_years, query.max_years, query.skills, query.education)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    # Set on disconnect from the event loop, while a step may still be running in its thread
+    cancel = threading.Event()
+    events = semantic_search.search_events(query.query, metadata_filter, cancel)
+
+    async def body():
+        try:
+            while True:
+                # Each step may wait on Gemini, so it runs off the event loop
+                event = await run_blocking(next, events, None)
+                if event is None:
+                    break
+                if sse:
+                    yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+                else:
+                    yield json.dumps(event) + "\n"
+        finally:
+            # Client went away: queued LLM calls are skipped right away
+            cancel.set()
+            try:
+                events.close()
+            except ValueError:
+                pass  # a step is still running in its thread; it returns once cancel is seen
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.post("/api/calculate-job-match")
@@ -247,7 +555,7 @@ async def calculate_job_match(
         raise HTTPException(status_code=401, detail="Unauthorized")
 
     # Get candidate profile
-    profile = profile_manager.get_profile(user_id)
+    profile = await run_blocking(profile_manager.get_profile, user_id)
     if not profile:
         return {"matchScore": 0}
 
@@ -258,10 +566,10 @@ async def calculate_job_match(
     job_requirements = f"{job_data.get('role', '')} {job_data.get('description', '')} {job_data.get('requirements', '')}"
 
     try:
-        match_score = semantic_search.calculate_job_match(profile, job_requirements)
+        match_score = await run_blocking(semantic_search.calculate_job_match, profile, job_requirements)
         return {"matchScore": match_score}
     except Exception as e:
-        print(f"Error calculating match: {e}")
+        logger.warning("Error calculating match: %s", e)
         return {"matchScore": 0} # Return default score on error
 
 
@@ -277,10 +585,10 @@ async def get_user_ids_with_resumes(
 
     try:
         # Fetch distinct user_ids from the profiles collection
-        user_ids = profile_manager.get_all_profile_user_ids()
+        user_ids = await run_blocking(profile_manager.get_all_profile_user_ids)
         return user_ids
     except Exception as e:
-        print(f"Error fetching user_ids with resumes: {e}")
+        logger.error("Error fetching user_ids with resumes: %s", e)
         raise HTTPException(status_code=500, detail="Error retrieving user IDs")
 
 
@@ -297,23 +605,28 @@ async def calculate_batch_job_match(
         raise HTTPException(status_code=401, detail="Unauthorized")
 
     # Get the single candidate profile needed for all calculations
-    profile = profile_manager.get_profile(user_id)
+    profile = await run_blocking(profile_manager.get_profile, user_id)
     if not profile:
         # Return scores of 0 for all requested jobs if profile not found
         return [BatchMatchResponseItem(job_id=job.job_id, matchScore=0) for job in request_data.jobs]
 
-    results = []
-    # Calculate score for each job sequentially
-    for job in request_data.jobs:
-        job_requirements = f"{job.role or ''} {job.description or ''} {job.requirements or ''}"
-        score = 0 # Default score
-        try:
-            # Reuse the existing single-score calculation logic
-            score = semantic_search.calculate_job_match(profile, job_requirements)
-        except Exception as e:
-            print(f"Error calculating match for job {job.job_id} and user {user_id}: {e}")
-            score = 0 # Assign 0 on error
-        results.append(BatchMatchResponseItem(job_id=job.job_id, matchScore=score))
+    # Embedding scores for every job, LLM refinement for the best few
+    job_requirements = [
+        f"{job.role or ''} {job.description or ''} {job.requirements or ''}"
+        for job in request_data.jobs
+    ]
+    try:
+        scores = await run_blocking(
+            semantic_search.calculate_job_matches, profile, job_requirements, request_data.refine
+        )
+    except Exception as e:
+        logger.warning("Error calculating batch match for user %s: %s", user_id, e)
+        scores = [(0, None)] * len(request_data.jobs) # Assign 0 on error
+
+    results = [
+        BatchMatchResponseItem(job_id=job.job_id, matchScore=score, scoreSource=source)
+        for job, (score, source) in zip(request_data.jobs, scores)
+    ]
 
     return results
 
@@ -0,0 +1,82 @@
+import hashlib
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+
+from .cache import LRUCache
+from .vector_index import MemmapVectorStore
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different inputs share a cache entry"""
+    return " ".join(text.split())
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache keyed by a hash of (model name, normalized text).
+    The memory tier is a bounded LRU of read-only float32 arrays; the
+    optional disk tier is a memory-mapped vector store that survives
+    restarts. The disk tier is append-only with no eviction, so it stops
+    taking new entries once it holds disk_max_entries (delete the
+    directory to start over).
+    """
+
+    def __init__(self, model_name: str, dimension: int, maxsize: int = 4096,
+                 disk_path: Optional[str] = None, disk_max_entries: int = 1_000_000):
+        self.model_name = model_name
+        self.memory = LRUCache(maxsize=maxsize)
+        self.disk = MemmapVectorStore(disk_path, dimension) if disk_path else None
+        self.disk_max_entries = disk_max_entries
+        self.disk_hits = 0
+        self._disk_lock = threading.Lock()
+
+    def key(self, text: str) -> str:
+        payload = f"{self.model_name}\0{text}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        key = self.key(text)
+        embedding = self.memory.get(key)
+        if embedding is not None:
+            return embedding
+
+        if self.disk is not None:
+            with self._disk_lock:
+                vector = self.disk.get(key)
+            if vector is not None:
+                embedding = self._frozen(vector)
+                self.disk_hits += 1
+                self.memory.set(key, embedding)
+                return embedding
+        return None
+
+    def set(self, text: str, embedding) -> np.ndarray:
+        """Cache an embedding, returns the stored (read-only float32) copy"""
+        key = self.key(text)
+        embedding = self._frozen(embedding)
+        self.memory.set(key, embedding)
+        if self.disk is not None:
+            with self._disk_lock:
+                if len(self.disk) < self.disk_max_entries or key in self.disk.rows:
+                    self.disk.put_many([{"key": key, "values": embedding}])
+        return embedding
+
+    @staticmethod
+    def _frozen(embedding) -> np.ndarray:
+        # float32 arrays are ~8x smaller than lists of Python floats; entries are shared, so read-only
+        array = np.array(embedding, dtype=np.float32)
+        array.setflags(write=False)
+        return array
+
+    def stats(self) -> Dict:
+        stats = self.memory.stats()
+        # Disk hits were counted as memory misses, report them as hits overall
+        stats["disk_hits"] = self.disk_hits
+        stats["disk_size"] = len(self.disk) if self.disk is not None else 0
+        stats["misses"] -= self.disk_hits
+        stats["hits"] += self.disk_hits
+        total = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / total, 4) if total else 0.0
+        return stats
@@ -0,0 +1,82 @@
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# torch: the stock fp32 model
+# torch-int8: Linear layers dynamically quantized to int8 (needs nothing extra)
+# onnx / onnx-int8: ONNX Runtime, needs `pip install optimum[onnxruntime]`
+EMBEDDING_BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+# Pre-quantized export shipped in the all-MiniLM-L6-v2 model repo; runs on any AVX2 CPU
+DEFAULT_ONNX_INT8_FILE = "onnx/model_quint8_avx2.onnx"
+
+
+def load_sentence_transformer(model_name: str, backend: str = "torch"):
+    """Load a SentenceTransformer for CPU inference with the given backend"""
+    # Imported here so processes that never embed don't pay for torch
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+
+    if backend == "torch-int8":
+        import torch
+        model = SentenceTransformer(model_name, device="cpu")
+        torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+        return model
+
+    if backend == "onnx":
+        return SentenceTransformer(model_name, device="cpu", backend="onnx")
+
+    if backend == "onnx-int8":
+        return SentenceTransformer(
+            model_name,
+            device="cpu",
+            backend="onnx",
+            model_kwargs={"file_name": os.getenv("EMBEDDING_ONNX_FILE", DEFAULT_ONNX_INT8_FILE)},
+        )
+
+    raise ValueError(f"Unknown EMBEDDING_BACKEND: {backend}")
+
+
+class LazyEmbeddingModel:
+    """
+    Loads the embedding model on first use (or on warm_up) instead of at import.
+    Exposes encode() like a SentenceTransformer; concurrent first callers wait
+    for a single load.
+    """
+
+    def __init__(self, model_name: str, backend: str = "torch"):
+        if backend not in EMBEDDING_BACKENDS:
+            raise ValueError(f"Unknown EMBEDDING_BACKEND: {backend}")
+        self.model_name = model_name
+        self.backend = backend
+        self.load_seconds: Optional[float] = None
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    started = time.perf_counter()
+                    model = load_sentence_transformer(self.model_name, self.backend)
+                    self.load_seconds = time.perf_counter() - started
+                    logger.info("Loaded %s (%s) in %.1fs", self.model_name, self.backend, self.load_seconds)
+                    self._model = model
+        return self._model
+
+    def warm_up(self):
+        """Load the model and run one encode so the first request isn't slow"""
+        self.load().encode(["warm up"], normalize_embeddings=True)
+
+    def encode(self, sentences, **kwargs):
+        return self.load().encode(sentences, **kwargs)
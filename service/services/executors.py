@@ -0,0 +1,96 @@
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from .logs import setup_worker_logging
+from .metrics import call_with_spans, record_spans
+
+# Blocking I/O (SDK calls, Mongo, file writes) runs on a thread pool;
+# CPU-bound work (resume parsing) runs on CPU_POOL_KIND = thread | process.
+# Pages of long PDFs are extracted in parallel on a separate process pool.
+_io_pool: Optional[ThreadPoolExecutor] = None
+_cpu_pool: Optional[Executor] = None
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+
+# Set by the process pool initializer; checked rather than
+# multiprocessing.parent_process(), which is also set in uvicorn's spawned workers
+_IN_POOL_WORKER = False
+
+
+def init_pool_worker():
+    """Initializer of every process pool worker"""
+    global _IN_POOL_WORKER
+    _IN_POOL_WORKER = True
+    setup_worker_logging()
+
+
+def in_pool_worker() -> bool:
+    return _IN_POOL_WORKER
+
+
+def get_io_pool() -> ThreadPoolExecutor:
+    global _io_pool
+    if _io_pool is None:
+        _io_pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv("IO_POOL_WORKERS", "32")),
+            thread_name_prefix="io"
+        )
+    return _io_pool
+
+
+def get_cpu_pool() -> Executor:
+    global _cpu_pool
+    if _cpu_pool is None:
+        workers = int(os.getenv("CPU_POOL_WORKERS") or os.cpu_count() or 1)
+        if os.getenv("CPU_POOL_KIND", "thread").lower() == "process":
+            _cpu_pool = ProcessPoolExecutor(max_workers=workers, initializer=init_pool_worker)
+        else:
+            _cpu_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cpu")
+    return _cpu_pool
+
+
+def get_pdf_pool() -> ProcessPoolExecutor:
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(
+            max_workers=int(os.getenv("PDF_POOL_WORKERS") or os.cpu_count() or 1),
+            initializer=init_pool_worker
+        )
+    return _pdf_pool
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """Run blocking I/O off the event loop"""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, func, *args, **kwargs)
+    return await loop.run_in_executor(get_io_pool(), call)
+
+
+async def run_cpu_bound(func: Callable, *args) -> Any:
+    """
+    Run CPU-bound work on the CPU pool
+    func and args must be picklable when CPU_POOL_KIND=process
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_cpu_pool()
+    if isinstance(pool, ProcessPoolExecutor):
+        # Timing spans recorded in the worker come back with the result
+        result, spans = await loop.run_in_executor(pool, call_with_spans, func, *args)
+        record_spans(spans)
+        return result
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(pool, functools.partial(ctx.run, func, *args))
+
+
+def shutdown_pools():
+    global _io_pool, _cpu_pool, _pdf_pool
+    for pool in (_io_pool, _cpu_pool, _pdf_pool):
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    _io_pool = None
+    _cpu_pool = None
+    _pdf_pool = None
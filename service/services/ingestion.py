@@ -0,0 +1,168 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional
+
+from .executors import run_blocking
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+
+
+class IngestionJobStore:
+    """SQLite table holding resume ingestion jobs so they survive restarts"""
+
+    def __init__(self, db_path: str):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS ingestion_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    file_path TEXT NOT NULL,
+                    filename TEXT,
+                    status TEXT NOT NULL,
+                    error TEXT,
+                    result TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+
+    def create(self, job_id: str, user_id: str, file_path: str, filename: str):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO ingestion_jobs VALUES (?, ?, ?, ?, ?, NULL, NULL, ?, ?)",
+                (job_id, user_id, file_path, filename, QUEUED, now, now)
+            )
+
+    def update(self, job_id: str, status: str, result: Optional[Dict] = None,
+               error: Optional[str] = None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE ingestion_jobs SET status = ?, result = ?, error = ?, updated_at = ? "
+                "WHERE job_id = ?",
+                (status, json.dumps(result) if result is not None else None, error,
+                 time.time(), job_id)
+            )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM ingestion_jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def unfinished(self):
+        """Jobs that were queued or mid-flight when the process stopped"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM ingestion_jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (QUEUED, PROCESSING)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+class IngestionQueue:
+    """
+    Local resume ingestion queue drained by a fixed pool of asyncio workers.
+    The upload endpoint persists the file and submits a job; workers run the
+    handler (Cloudinary -> parse -> embed -> index -> Mongo) with at most
+    `workers` ingestions in flight, independent of API traffic.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[str, str, Optional[str]], Awaitable[Dict]],
+        spool_dir: str,
+        db_path: str,
+        workers: int = 2,
+    ):
+        self.handler = handler
+        self.spool_dir = Path(spool_dir)
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.store = IngestionJobStore(db_path)
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+
+    def spool_path(self, job_id: str, filename: str) -> Path:
+        """Where the uploaded file for a job is kept until it is processed"""
+        return self.spool_dir / f"{job_id}{Path(filename).suffix.lower()}"
+
+    def new_job_id(self) -> str:
+        return uuid.uuid4().hex
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        for job in await run_blocking(self.store.unfinished):
+            logger.info("Re-queueing unfinished job %s", job["job_id"])
+            self._queue.put_nowait(job["job_id"])
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, job_id: str, user_id: str, file_path: Path, filename: str) -> str:
+        """Register an already spooled file as a job"""
+        await run_blocking(self.store.create, job_id, user_id, str(file_path), filename)
+        self._queue.put_nowait(job_id)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self.store.get(job_id)
+
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str):
+        job = await run_blocking(self.store.get, job_id)
+        if job is None or job["status"] in (DONE, FAILED):
+            return
+
+        file_path = Path(job["file_path"])
+        await run_blocking(self.store.update, job_id, PROCESSING)
+        try:
+            result = await self.handler(job["user_id"], str(file_path), job["filename"])
+            await run_blocking(self.store.update, job_id, DONE, result)
+            logger.info("Job %s completed", job_id)
+        except asyncio.CancelledError:
+            # Left as processing with its file, picked up again on the next start
+            raise
+        except Exception as e:
+            logger.warning("Job %s failed: %s: %s", job_id, type(e).__name__, e)
+            await run_blocking(self.store.update, job_id, FAILED, None, str(e))
+
+        try:
+            if file_path.exists():
+                file_path.unlink()
+        except Exception as e:
+            logger.warning("Error deleting spooled file %s: %s", file_path, e)
@@ -0,0 +1,159 @@
+import math
+import re
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .skill_matcher import SkillMatcher
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+
+# Too common to rank by; dropping them keeps every posting list short
+_STOPWORDS = {"a", "an", "and", "as", "at", "by", "for", "in", "of", "on", "or", "the", "to", "with"}
+
+# Words that may appear around skills in a pure skill query ("kafka and golang")
+_QUERY_FILLER = {"plus", "skills", "skill", "developer", "engineer"}
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def split_skills(skills: str) -> List[str]:
+    """The normalized comma-separated list produced by extract_skills"""
+    return [
+        skill.strip().lower() for skill in skills.split(",")
+        if skill.strip() and skill.strip().lower() != "not specified"
+    ]
+
+
+class LexicalIndex:
+    """
+    In-memory inverted index over candidate skills and experience text.
+    skill -> user_ids postings answer exact skill queries by intersection;
+    term postings with term frequencies give BM25 scores for free text.
+    Kept current by VectorDB on every upsert; each process holds its own copy,
+    rebuilt from MongoDB at startup.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.skill_postings: Dict[str, Set[str]] = {}
+        self.term_postings: Dict[str, Dict[str, int]] = {}
+        self._docs: Dict[str, Tuple[List[str], Dict[str, int], int]] = {}
+        # Small per-candidate fields (the search filter targets) checked by select()
+        self._attributes: Dict[str, Dict] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def upsert(self, user_id: str, skills: str, text: str, attributes: Optional[Dict] = None):
+        """Index (or re-index) one candidate"""
+        skill_list = split_skills(skills or "")
+        term_counts: Dict[str, int] = {}
+        for term in tokenize(f"{skills or ''} {text or ''}"):
+            term_counts[term] = term_counts.get(term, 0) + 1
+        with self._lock:
+            self._remove(user_id)
+            for skill in skill_list:
+                self.skill_postings.setdefault(skill, set()).add(user_id)
+            for term, count in term_counts.items():
+                self.term_postings.setdefault(term, {})[user_id] = count
+            length = sum(term_counts.values())
+            self._docs[user_id] = (skill_list, term_counts, length)
+            self._attributes[user_id] = attributes or {}
+            self._total_length += length
+
+    def remove(self, user_id: str):
+        with self._lock:
+            self._remove(user_id)
+
+    def _remove(self, user_id: str):
+        doc = self._docs.pop(user_id, None)
+        if doc is None:
+            return
+        skill_list, term_counts, length = doc
+        self._attributes.pop(user_id, None)
+        for skill in skill_list:
+            postings = self.skill_postings.get(skill)
+            if postings is not None:
+                postings.discard(user_id)
+                if not postings:
+                    del self.skill_postings[skill]
+        for term in term_counts:
+            postings = self.term_postings.get(term)
+            if postings is not None:
+                postings.pop(user_id, None)
+                if not postings:
+                    del self.term_postings[term]
+        self._total_length -= length
+
+    def with_all_skills(self, skills: Iterable[str]) -> Set[str]:
+        """user_ids having every skill; intersects the shortest postings first"""
+        with self._lock:
+            postings = [self.skill_postings.get(skill.lower(), set()) for skill in skills]
+            if not postings:
+                return set()
+            postings.sort(key=len)
+            found = set(postings[0])
+            for other in postings[1:]:
+                found &= other
+                if not found:
+                    break
+            return found
+
+    def select(self, user_ids: Iterable[str], predicate: Callable[[Dict], bool]) -> Set[str]:
+        """The user_ids whose stored attributes satisfy predicate"""
+        with self._lock:
+            return {user_id for user_id in user_ids if predicate(self._attributes.get(user_id, {}))}
+
+    def bm25(self, query: str, top_k: int = 20, user_ids: Optional[Set[str]] = None) -> List[Tuple[str, float]]:
+        """Best (user_id, score) for a free-text query, optionally only within user_ids"""
+        terms = set(tokenize(query))
+        scores: Dict[str, float] = {}
+        with self._lock:
+            n = len(self._docs)
+            if not n:
+                return []
+            average_length = self._total_length / n
+            for term in terms:
+                postings = self.term_postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for user_id, tf in postings.items():
+                    if user_ids is not None and user_id not in user_ids:
+                        continue
+                    length = self._docs[user_id][2]
+                    norm = tf + self.k1 * (1 - self.b + self.b * length / average_length)
+                    scores[user_id] = scores.get(user_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+
+def parse_skill_query(query: str, matcher: SkillMatcher) -> Optional[List[str]]:
+    """
+    The skills of a query made only of dictionary skills ("kafka golang"),
+    or None when it has other words and needs ranked retrieval
+    """
+    query_lower = query.lower()
+    skills = matcher.find(query_lower)
+    if not skills:
+        return None
+    covered = set()
+    for skill in skills:
+        covered.update(tokenize(skill))
+        covered.update(tokenize(skill.replace(" ", "").replace("-", "")))
+    if all(token in covered or token in _QUERY_FILLER for token in tokenize(query_lower)):
+        return sorted(skills)
+    return None
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists: score = sum of 1 / (k + rank) over the lists an id appears in"""
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, user_id in enumerate(ranking, start=1):
+            fused[user_id] = fused.get(user_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
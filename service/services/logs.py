@@ -0,0 +1,51 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from typing import Optional
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging():
+    """
+    Route all logging through a QueueHandler so request threads never block
+    on stderr; a background QueueListener does the writing.
+    LOG_LEVEL sets the level (default INFO).
+    """
+    global _listener
+    if _listener is not None:
+        return
+    log_queue = queue.SimpleQueue()
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(logging.Formatter(LOG_FORMAT))
+    _listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    atexit.register(stop_logging)
+
+
+def setup_worker_logging():
+    """
+    Process pool initializer: a forked worker inherits the QueueHandler but
+    not the listener thread, so it logs straight to stderr instead
+    """
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    root = logging.getLogger()
+    root.handlers = [handler]
+
+
+def stop_logging():
+    """Flush queued records"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
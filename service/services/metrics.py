@@ -0,0 +1,93 @@
+import contextvars
+import functools
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, Histogram, generate_latest
+
+# Stages range from sub-millisecond cache lookups to multi-second LLM calls
+_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+STAGE_SECONDS = Histogram(
+    "spherical_stage_seconds", "Time spent in one stage of a request", ["stage"], buckets=_BUCKETS
+)
+REQUEST_SECONDS = Histogram(
+    "spherical_http_request_seconds", "HTTP request latency", ["method", "route", "status"],
+    buckets=_BUCKETS
+)
+
+# (stage, seconds) recorded while serving the current request, for Server-Timing.
+# run_blocking/run_cpu_bound copy the context, so worker threads append to the same list.
+_request_spans: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar(
+    "request_spans", default=None
+)
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+
+def record(stage: str, seconds: float):
+    STAGE_SECONDS.labels(stage).observe(seconds)
+    spans = _request_spans.get()
+    if spans is not None:
+        spans.append((stage, seconds))
+
+
+@contextmanager
+def span(stage: str):
+    """Time a block as `stage` (also when it raises)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - started)
+
+
+def timed(stage: str):
+    """Decorator form of span()"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_request() -> List[Tuple[str, float]]:
+    spans: List[Tuple[str, float]] = []
+    _request_spans.set(spans)
+    return spans
+
+
+def server_timing(spans: List[Tuple[str, float]], total: float) -> str:
+    """Server-Timing header value; repeated stages are summed"""
+    totals: Dict[str, float] = {}
+    counts: Dict[str, int] = {}
+    for stage, seconds in list(spans):
+        totals[stage] = totals.get(stage, 0.0) + seconds
+        counts[stage] = counts.get(stage, 0) + 1
+    entries = [
+        f'{stage};dur={seconds * 1000:.1f}' + (f';desc="x{counts[stage]}"' if counts[stage] > 1 else "")
+        for stage, seconds in totals.items()
+    ]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def call_with_spans(func: Callable, *args) -> Tuple[Any, List[Tuple[str, float]]]:
+    """
+    Run func in a process pool worker and return its spans with the result;
+    the worker's own histograms are never scraped, so the parent re-records them
+    """
+    spans = start_request()
+    return func(*args), spans
+
+
+def record_spans(spans: List[Tuple[str, float]]):
+    for stage, seconds in spans:
+        record(stage, seconds)
+
+
+def latest() -> bytes:
+    return generate_latest()
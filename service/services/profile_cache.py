@@ -0,0 +1,113 @@
+import copy
+import os
+import threading
+from typing import Dict, List, Optional
+
+from .cache import LRUCache
+
+
+class SharedInvalidationLog:
+    """
+    Append-only file of invalidated user_ids shared by every worker on a host.
+    Each process remembers how far it has read; a truncated file means
+    "drop everything" (the log is truncated when it grows too large).
+    """
+
+    def __init__(self, path: str, max_bytes: int = 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        open(path, "a").close()
+        # Earlier entries predate this process's (empty) cache
+        self._offset = os.path.getsize(path)
+        self._lock = threading.Lock()
+
+    def publish(self, user_id: str):
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+        try:
+            if os.fstat(fd).st_size > self.max_bytes:
+                os.ftruncate(fd, 0)
+            os.write(fd, (user_id + "\n").encode("utf-8"))
+        finally:
+            os.close(fd)
+
+    def poll(self) -> Optional[List[str]]:
+        """user_ids invalidated since the last poll, or None if everything must go"""
+        with self._lock:
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                return []
+            if size == self._offset:
+                return []
+            if size < self._offset:
+                self._offset = size
+                return None
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read(size - self._offset)
+            # Only consume complete lines
+            consumed = data.rfind(b"\n") + 1
+            self._offset += consumed
+            return [line for line in data[:consumed].decode("utf-8").split("\n") if line]
+
+
+class ProfileCache:
+    """
+    Bounded TTL/LRU cache of full profile documents.
+    Writers call invalidate(); with a shared log the invalidation also
+    reaches the caches of other worker processes.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60,
+                 shared_log: Optional[SharedInvalidationLog] = None):
+        self.entries = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.shared_log = shared_log
+        self._generation = 0
+
+    def _sync(self):
+        if self.shared_log is None:
+            return
+        invalidated = self.shared_log.poll()
+        if invalidated is None:
+            self.entries.clear()
+            self._generation += 1
+            return
+        for user_id in invalidated:
+            self.entries.pop(user_id)
+        if invalidated:
+            self._generation += 1
+
+    def generation(self) -> int:
+        """Take before reading from MongoDB and pass to set()"""
+        return self._generation
+
+    def get(self, user_id: str) -> Optional[Dict]:
+        self._sync()
+        profile = self.entries.get(user_id)
+        # Callers may mutate what they get back
+        return copy.deepcopy(profile) if profile is not None else None
+
+    def get_many(self, user_ids: List[str]) -> Dict[str, Dict]:
+        self._sync()
+        found = {}
+        for user_id in user_ids:
+            profile = self.entries.get(user_id)
+            if profile is not None:
+                found[user_id] = profile
+        return copy.deepcopy(found)
+
+    def set(self, user_id: str, profile: Dict, generation: int):
+        # A write that landed while this profile was being read makes it stale
+        if generation != self._generation:
+            return
+        self.entries.set(user_id, copy.deepcopy(profile))
+
+    def invalidate(self, user_id: str):
+        self._generation += 1
+        self.entries.pop(user_id)
+        if self.shared_log is not None:
+            self.shared_log.publish(user_id)
+
+    def stats(self) -> Dict:
+        return self.entries.stats()
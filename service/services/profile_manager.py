@@ -1,12 +1,50 @@
 from pymongo import MongoClient
-from typing import Dict, Optional, List
+from pymongo.errors import PyMongoError
+from typing import Dict, Iterator, Optional, List
+from datetime import datetime, timezone
+import logging
 import os
+import threading
+from .metrics import span
+from .profile_cache import ProfileCache, SharedInvalidationLog
+from .search_filters import normalized_fields
+
+logger = logging.getLogger(__name__)
+
+# One client (and connection pool) per process, shared by every ProfileManager
+_client: Optional[MongoClient] = None
+_client_lock = threading.Lock()
+
+
+def get_mongo_client() -> MongoClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = MongoClient(
+                os.getenv("MONGODB_URI"),
+                # Fail fast when MongoDB is unreachable instead of the 30s default
+                serverSelectionTimeoutMS=int(os.getenv("MONGODB_TIMEOUT_MS", "5000")),
+            )
+    return _client
+
 
 class ProfileManager:
-    def __init__(self):
-        self.client = MongoClient(os.getenv("MONGODB_URI"))
+    def __init__(self, cache: Optional[ProfileCache] = None, client: Optional[MongoClient] = None):
+        self.client = client if client is not None else get_mongo_client()
         self.db = self.client.spherical
         self.profiles = self.db.profiles
+        self.extractions = self.db.resume_extractions
+        self.cache = cache if cache is not None else self._create_cache()
+    
+    @staticmethod
+    def _create_cache() -> ProfileCache:
+        """Read-through profile cache; PROFILE_CACHE_SHARED_PATH shares invalidations across workers"""
+        shared_path = os.getenv("PROFILE_CACHE_SHARED_PATH")
+        return ProfileCache(
+            maxsize=int(os.getenv("PROFILE_CACHE_SIZE", "1024")),
+            ttl=float(os.getenv("PROFILE_CACHE_TTL_SECONDS", "60")),
+            shared_log=SharedInvalidationLog(shared_path) if shared_path else None,
+        )
     
     def create_or_update_profile(self, user_id: str, profile_data: Dict) -> Dict:
         """Store complete profile data"""
@@ -20,39 +58,149 @@ class ProfileManager:
             "phone": profile_data.get('phone', ''),
             "raw_text": profile_data.get('raw_text', ''),
             "resume_url": profile_data.get('resume_url', ''), # Add this line
+            "resume_sha256": profile_data.get('resume_sha256', ''),
+            "extractor_version": profile_data.get('extractor_version', ''),
         }
+        # skills_list, years_exp_num and education_rank, for search filters
+        profile.update(normalized_fields(profile))
+        
+        operations = {"$set": profile}
+        if "years_exp_num" not in profile:
+            operations["$unset"] = {"years_exp_num": ""}
         
         # Upsert profile
-        self.profiles.update_one(
-            {"user_id": user_id},
-            {"$set": profile},
-            upsert=True
-        )
+        with span("mongo.save_profile"):
+            self.profiles.update_one(
+                {"user_id": user_id},
+                operations,
+                upsert=True
+            )
+        self.cache.invalidate(user_id)
         
-        print(f"✅ Profile saved for user: {user_id}")
+        logger.info("Profile saved for user: %s", user_id)
         
         return profile
     
+    def ping(self):
+        """Raises if MongoDB can't be reached"""
+        with span("mongo.ping"):
+            self.client.admin.command("ping")
+    
+    def ensure_indexes(self):
+        """Unique index on user_id so single and bulk lookups are index scans"""
+        self.profiles.create_index("user_id", unique=True)
+        self.extractions.create_index([("content_hash", 1), ("extractor_version", 1)], unique=True)
+    
     def get_profile(self, user_id: str) -> Optional[Dict]:
         """Get complete profile"""
-        profile = self.profiles.find_one({"user_id": user_id}, {"_id": 0})
+        profile = self.cache.get(user_id)
+        if profile is not None:
+            return profile
+        
+        generation = self.cache.generation()
+        with span("mongo.get_profile"):
+            profile = self.profiles.find_one({"user_id": user_id}, {"_id": 0})
+        if profile is not None:
+            self.cache.set(user_id, profile, generation)
         return profile
     
+    def get_profiles(self, user_ids: List[str], fields: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """Get many profiles in one query, keyed by user_id (missing ids are left out)"""
+        if not user_ids:
+            return {}
+        user_ids = list(dict.fromkeys(user_ids))
+        
+        found = self.cache.get_many(user_ids)
+        if fields:
+            wanted = set(fields) | {"user_id"}
+            found = {
+                user_id: {k: v for k, v in profile.items() if k in wanted}
+                for user_id, profile in found.items()
+            }
+        
+        missing = [user_id for user_id in user_ids if user_id not in found]
+        if not missing:
+            return found
+        
+        projection = {"_id": 0}
+        if fields:
+            projection.update({field: 1 for field in fields})
+            projection["user_id"] = 1
+        
+        generation = self.cache.generation()
+        with span("mongo.get_profiles"):
+            profiles = list(self.profiles.find({"user_id": {"$in": missing}}, projection))
+        for profile in profiles:
+            found[profile["user_id"]] = profile
+            # Only complete documents are cached
+            if not fields:
+                self.cache.set(profile["user_id"], profile, generation)
+        return found
+    
     def update_profile(self, user_id: str, updates: Dict) -> Dict:
         """Update specific fields"""
-        self.profiles.update_one(
-            {"user_id": user_id},
-            {"$set": updates}
-        )
+        updates = dict(updates)
+        unset = {}
+        if {'skills', 'education', 'years_of_experience'} & set(updates):
+            # Keep the normalized filter fields in step with the text they come from
+            merged = {**(self.get_profile(user_id) or {}), **updates}
+            updates.update(normalized_fields(merged))
+            if "years_exp_num" not in updates:
+                unset["years_exp_num"] = ""
+        operations = {"$set": updates}
+        if unset:
+            operations["$unset"] = unset
+        with span("mongo.update_profile"):
+            self.profiles.update_one(
+                {"user_id": user_id},
+                operations
+            )
+        self.cache.invalidate(user_id)
         return self.get_profile(user_id)
     
+    def get_extraction(self, content_hash: str, extractor_version: str) -> Optional[Dict]:
+        """Parsed resume fields for a file's sha256, shared by every user who uploads it"""
+        with span("mongo.get_extraction"):
+            doc = self.extractions.find_one(
+                {"content_hash": content_hash, "extractor_version": extractor_version},
+                {"_id": 0, "data": 1}
+            )
+        return doc["data"] if doc else None
+    
+    def save_extraction(self, content_hash: str, extractor_version: str, data: Dict) -> bool:
+        """
+        Best effort: a failed write only costs a re-parse later. Two concurrent
+        uploads of the same file can race on the unique index (DuplicateKeyError);
+        the other one's copy is just as good.
+        """
+        try:
+            with span("mongo.save_extraction"):
+                self.extractions.update_one(
+                    {"content_hash": content_hash, "extractor_version": extractor_version},
+                    {"$set": {"data": data, "created_at": datetime.now(timezone.utc)}},
+                    upsert=True
+                )
+        except PyMongoError as e:
+            logger.warning("Could not cache extraction %s: %s", content_hash, e)
+            return False
+        return True
+    
+    def iter_profiles(self, fields: Optional[List[str]] = None, batch_size: int = 1000) -> Iterator[Dict]:
+        """Stream every stored profile (optionally only some fields), batch_size per round trip"""
+        projection = {"_id": 0}
+        if fields:
+            projection.update({field: 1 for field in fields})
+            projection["user_id"] = 1
+        yield from self.profiles.find({}, projection, batch_size=batch_size)
+    
     def get_all_profile_user_ids(self) -> List[str]:
             """Get all distinct user_ids from the profiles collection using distinct()"""
             try:
                 # Use distinct to get unique user_ids directly from the database
-                user_ids = self.profiles.distinct("user_id")
+                with span("mongo.distinct_user_ids"):
+                    user_ids = self.profiles.distinct("user_id")
                 # Ensure all items are strings (distinct might return other types if schema is loose)
                 return [str(uid) for uid in user_ids if uid is not None]
             except Exception as e:
-                print(f"Error fetching distinct user_ids: {e}")
+                logger.error("Error fetching distinct user_ids: %s", e)
                 return [] # Return empty list on error
\ No newline at end of file
@@ -0,0 +1,61 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .executors import run_blocking
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+# An optional step that failed; reported, but doesn't hold back readiness
+DEGRADED = "degraded"
+
+
+class ReadinessTracker:
+    """Per-dependency startup status and init timings, reported by /api/ready"""
+
+    def __init__(self):
+        self.dependencies: Dict[str, Dict] = {}
+        self._optional = set()
+
+    def add(self, name: str, required: bool = True, **info):
+        self.dependencies[name] = {"status": PENDING, "seconds": None, **info}
+        if not required:
+            self._optional.add(name)
+
+    async def run(self, name: str, func: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """
+        Run a blocking init step off the event loop and record how it went
+        A step that outlives timeout is reported failed (its thread is left to finish);
+        optional steps are reported degraded instead
+        """
+        entry = self.dependencies.setdefault(name, {"status": PENDING, "seconds": None})
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(run_blocking(func, *args), timeout)
+        except Exception as e:
+            entry["status"] = DEGRADED if name in self._optional else FAILED
+            entry["error"] = f"timed out after {timeout:g}s" if isinstance(e, asyncio.TimeoutError) else str(e)
+            entry["seconds"] = round(time.perf_counter() - started, 3)
+            logger.error("%s failed after %ss: %s", name, entry["seconds"], entry["error"])
+            raise
+        entry["status"] = READY
+        entry["seconds"] = round(time.perf_counter() - started, 3)
+        logger.info("%s ready in %ss", name, entry["seconds"])
+        return result
+
+    def is_ready(self, name: str) -> bool:
+        return self.dependencies.get(name, {}).get("status") == READY
+
+    def report(self) -> Dict:
+        statuses = [entry["status"] for entry in self.dependencies.values()]
+        if FAILED in statuses:
+            status = FAILED
+        elif statuses and all(s in (READY, DEGRADED) for s in statuses):
+            status = READY
+        else:
+            status = "starting"
+        return {"status": status, "dependencies": self.dependencies}
@@ -0,0 +1,192 @@
+"""
+Rebuild the vector index from the MongoDB profiles collection.
+
+    python -m service.services.reindex [--batch-size 256] [--checkpoint FILE] [--reset]
+
+Profiles are streamed in user_id order through three pipeline stages
+(Mongo read -> batch encode -> bulk upsert) connected by bounded queues,
+so memory stays flat regardless of collection size. After every written
+batch the last user_id is checkpointed; re-running the command resumes
+from there. The checkpoint is removed once the whole collection is done.
+"""
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+from dotenv import load_dotenv
+
+REINDEX_FIELDS = ["user_id", "skills", "experience", "education",
+                  "years_of_experience", "email", "raw_text"]
+
+_DONE = object()
+
+
+class _StageError:
+    def __init__(self, stage: str, error: Exception):
+        self.stage = stage
+        self.error = error
+
+
+def load_checkpoint(path: str) -> Optional[str]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f).get("last_user_id")
+
+
+def save_checkpoint(path: str, last_user_id: str, processed: int):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"last_user_id": last_user_id, "processed": processed,
+                   "updated_at": time.time()}, f)
+    os.replace(tmp_path, path)
+
+
+def iter_profile_batches(profiles, batch_size: int,
+                         after_user_id: Optional[str] = None) -> Iterator[List[Dict]]:
+    """Stream profiles in user_id order with a server-side cursor"""
+    query = {"user_id": {"$gt": after_user_id}} if after_user_id else {}
+    projection = {field: 1 for field in REINDEX_FIELDS}
+    projection["_id"] = 0
+    cursor = profiles.find(query, projection).sort("user_id", 1).batch_size(batch_size)
+
+    batch = []
+    try:
+        for doc in cursor:
+            if not doc.get("user_id"):
+                continue
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    finally:
+        cursor.close()
+
+
+def reindex(profile_manager, vector_db, batch_size: int = 256, queue_depth: int = 2,
+            checkpoint_path: Optional[str] = None, reset: bool = False) -> Dict:
+    """Run the read -> encode -> upsert pipeline, returns run statistics"""
+    if checkpoint_path and reset and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    after_user_id = load_checkpoint(checkpoint_path) if checkpoint_path else None
+    if after_user_id:
+        print(f"↻ Resuming re-index after user_id {after_user_id}")
+
+    read_queue: "queue.Queue" = queue.Queue(maxsize=queue_depth)
+    write_queue: "queue.Queue" = queue.Queue(maxsize=queue_depth)
+    stop = threading.Event()
+
+    def put(q: "queue.Queue", item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read_stage():
+        try:
+            for batch in iter_profile_batches(profile_manager.profiles, batch_size, after_user_id):
+                if not put(read_queue, batch):
+                    return
+            put(read_queue, _DONE)
+        except Exception as e:
+            put(read_queue, _StageError("read", e))
+
+    def encode_stage():
+        try:
+            while not stop.is_set():
+                try:
+                    batch = read_queue.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if batch is _DONE or isinstance(batch, _StageError):
+                    put(write_queue, batch)
+                    return
+                vectors = vector_db.build_candidate_vectors(
+                    {doc["user_id"]: doc for doc in batch}
+                )
+                if not put(write_queue, (batch[-1]["user_id"], vectors)):
+                    return
+        except Exception as e:
+            put(write_queue, _StageError("encode", e))
+
+    workers = [threading.Thread(target=read_stage, name="reindex-read", daemon=True),
+               threading.Thread(target=encode_stage, name="reindex-encode", daemon=True)]
+    for worker in workers:
+        worker.start()
+
+    processed = 0
+    started = time.perf_counter()
+    try:
+        while True:
+            item = write_queue.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _StageError):
+                raise RuntimeError(f"Re-index {item.stage} stage failed: {item.error}") from item.error
+
+            last_user_id, vectors = item
+            vector_db.upsert_vectors(vectors)
+            processed += len(vectors)
+            if checkpoint_path:
+                save_checkpoint(checkpoint_path, last_user_id, processed)
+
+            elapsed = time.perf_counter() - started
+            print(f"  {processed} profiles re-indexed "
+                  f"({processed / elapsed:.1f} profiles/sec, last user_id {last_user_id})")
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join(timeout=5)
+
+    elapsed = time.perf_counter() - started
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    stats = {
+        "processed": processed,
+        "seconds": round(elapsed, 2),
+        "profiles_per_sec": round(processed / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+    print(f"✅ Re-index complete: {stats['processed']} profiles in {stats['seconds']}s "
+          f"({stats['profiles_per_sec']} profiles/sec)")
+    return stats
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Rebuild the candidate vector index from MongoDB profiles")
+    parser.add_argument("--batch-size", type=int, default=256,
+                        help="profiles per encode/upsert batch")
+    parser.add_argument("--queue-depth", type=int, default=2,
+                        help="batches buffered between pipeline stages")
+    parser.add_argument("--checkpoint", default="reindex.checkpoint.json",
+                        help="file recording the last user_id written")
+    parser.add_argument("--reset", action="store_true",
+                        help="ignore any existing checkpoint and start from the beginning")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+
+    from .profile_manager import ProfileManager
+    from .vector_db import VectorDB
+
+    reindex(
+        ProfileManager(),
+        VectorDB(),
+        batch_size=args.batch_size,
+        queue_depth=args.queue_depth,
+        checkpoint_path=args.checkpoint,
+        reset=args.reset,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,118 @@
 import PyPDF2
 import docx
+import bisect
+import logging
+import os
 import re
-from typing import Dict
+import time
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import Dict, List, Tuple, Union
+from .executors import get_pdf_pool, in_pool_worker
+from .metrics import span
+from .skill_matcher import build_default_matcher
+
+logger = logging.getLogger(__name__)
+
+# Bump when extraction output changes; cached extractions from older
+# versions are redone the next time the same file is uploaded
+EXTRACTOR_VERSION = "2"
+
+# Built once at import from data/skills.txt (see skill_matcher.build_default_matcher)
+SKILL_MATCHER = build_default_matcher()
+
+# Text extraction budget: long portfolios stop contributing after this much
+RESUME_MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "40"))
+RESUME_MAX_CHARS = int(os.getenv("RESUME_MAX_CHARS", "200000"))
+RESUME_EXTRACT_DEADLINE_SECONDS = float(os.getenv("RESUME_EXTRACT_DEADLINE_SECONDS", "30"))
+# PDFs with at least this many pages are split across the PDF process pool
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "16"))
+PDF_PAGES_PER_TASK = 8
+
+
+def _extract_pdf_pages(file_path: str, start: int, stop: int) -> List[str]:
+    """Text of pages [start, stop); runs in a PDF pool worker"""
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        return [pdf_reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _extract_pdf_parallel(file_path: str, page_count: int, deadline: float) -> List[str]:
+    """Fan page ranges out over the PDF pool; stop at the char budget or deadline"""
+    pool = get_pdf_pool()
+    futures = [
+        pool.submit(_extract_pdf_pages, file_path, start, min(start + PDF_PAGES_PER_TASK, page_count))
+        for start in range(0, page_count, PDF_PAGES_PER_TASK)
+    ]
+    parts = []
+    chars = 0
+    try:
+        # Collected in page order so the budget keeps the first pages
+        for future in futures:
+            for page_text in future.result(timeout=max(deadline - time.monotonic(), 0)):
+                if page_text:
+                    parts.append(page_text)
+                    chars += len(page_text) + 1
+            if chars >= RESUME_MAX_CHARS:
+                break
+    except FuturesTimeoutError:
+        logger.warning("PDF extraction deadline reached for %s, using %d pages", file_path, len(parts))
+    except Exception as e:
+        # Like the serial path, keep the pages read before the failing range
+        logger.warning("Error reading PDF %s, using %d pages: %s", file_path, len(parts), e)
+    finally:
+        for future in futures:
+            future.cancel()
+    return parts
+
 
 def extract_text_from_pdf(file_path: str) -> str:
-    """Extract all text from PDF"""
-    text = ""
+    """Extract text from the first RESUME_MAX_PAGES pages of a PDF"""
+    parts = []
+    deadline = time.monotonic() + RESUME_EXTRACT_DEADLINE_SECONDS
     try:
         with open(file_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+            page_count = min(len(pdf_reader.pages), RESUME_MAX_PAGES)
+            # Pool workers never start a pool of their own
+            if page_count >= PDF_PARALLEL_MIN_PAGES and not in_pool_worker():
+                parts = _extract_pdf_parallel(file_path, page_count, deadline)
+            else:
+                chars = 0
+                for page in pdf_reader.pages[:page_count]:
+                    page_text = page.extract_text()
+                    if page_text:
+                        parts.append(page_text)
+                        chars += len(page_text) + 1
+                    if chars >= RESUME_MAX_CHARS or time.monotonic() > deadline:
+                        break
     except Exception as e:
-        print(f"Error reading PDF: {e}")
-    return text
+        logger.warning("Error reading PDF: %s", e)
+    text = "".join(part + "\n" for part in parts)
+    return text[:RESUME_MAX_CHARS]
 
 def extract_text_from_docx(file_path: str) -> str:
-    """Extract all text from DOCX"""
-    text = ""
+    """Extract all text from DOCX, up to RESUME_MAX_CHARS"""
+    parts = []
+    chars = 0
     try:
         doc = docx.Document(file_path)
         for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
+            parts.append(paragraph.text + "\n")
+            chars += len(parts[-1])
+            if chars >= RESUME_MAX_CHARS:
+                break
         # Also extract from tables
         for table in doc.tables:
+            if chars >= RESUME_MAX_CHARS:
+                break
             for row in table.rows:
                 for cell in row.cells:
-                    text += cell.text + " "
-            text += "\n"
+                    parts.append(cell.text + " ")
+                    chars += len(parts[-1])
+            parts.append("\n")
     except Exception as e:
-        print(f"Error reading DOCX: {e}")
-    return text
+        logger.warning("Error reading DOCX: %s", e)
+    return "".join(parts)[:RESUME_MAX_CHARS]
 
 def extract_email(text: str) -> str:
     """Extract email using regex"""
@@ -55,133 +135,97 @@ def extract_phone(text: str) -> str:
             return phones[0]
     return ""
 
-def extract_skills(text: str) -> str:
-    """Extract technical skills with better accuracy"""
-    skills_keywords = [
-        # Programming Languages (add more variations)
-        'python', 'java', 'javascript', 'js', 'typescript', 'ts', 'c++', 'cpp', 'c#', 'csharp',
-        'golang', 'go', 'rust', 'kotlin', 'swift', 'php', 'ruby', 'scala', 'r programming', 'matlab',
-        
-        # Frameworks & Libraries
-        'react', 'reactjs', 'angular', 'vue', 'vuejs', 'nodejs', 'node.js', 'node', 'express', 
-        'expressjs', 'django', 'flask', 'fastapi', 'spring boot', 'spring', 'laravel', 
-        'nextjs', 'next.js', 'nuxtjs', 'svelte',
-        
-        # Frontend
-        'html', 'html5', 'css', 'css3', 'sass', 'scss', 'less', 'tailwind', 'tailwindcss',
-        'bootstrap', 'jquery', 'webpack', 'vite', 'redux', 'mobx',
-        
-        # Mobile
-        'react native', 'flutter', 'android', 'ios', 'swift', 'kotlin', 'xamarin', 'ionic',
-        
-        # Databases
-        'sql', 'mysql', 'postgresql', 'postgres', 'mongodb', 'mongo', 'redis', 'elasticsearch',
-        'dynamodb', 'cassandra', 'oracle', 'sqlite', 'mariadb', 'neo4j', 'couchdb',
-        
-        # Cloud & DevOps
-        'aws', 'amazon web services', 'azure', 'microsoft azure', 'gcp', 'google cloud', 
-        'docker', 'kubernetes', 'k8s', 'jenkins', 'gitlab', 'github actions', 'circleci',
-        'terraform', 'ansible', 'puppet', 'chef', 'ci/cd', 'devops', 'vagrant',
-        
-        # AI/ML/Data Science
-        'machine learning', 'ml', 'deep learning', 'dl', 'tensorflow', 'pytorch', 'keras',
-        'scikit-learn', 'sklearn', 'pandas', 'numpy', 'scipy', 'nlp', 'natural language processing',
-        'computer vision', 'opencv', 'ai', 'artificial intelligence', 'data science',
-        'neural networks', 'cnn', 'rnn', 'lstm', 'transformers', 'bert', 'gpt',
-        
-        # Testing
-        'testing', 'unit testing', 'integration testing', 'junit', 'pytest', 'jest',
-        'mocha', 'chai', 'selenium', 'cypress', 'playwright', 'testng',
-        
-        # Version Control & Tools
-        'git', 'github', 'gitlab', 'bitbucket', 'svn', 'mercurial',
-        
-        # APIs & Protocols
-        'rest api', 'restful', 'graphql', 'soap', 'grpc', 'websocket', 'mqtt',
-        
-        # Architecture & Patterns
-        'microservices', 'monolithic', 'mvc', 'mvvm', 'serverless', 'event-driven',
-        
-        # Methodologies
-        'agile', 'scrum', 'kanban', 'waterfall', 'tdd', 'bdd', 'lean',
-        
-        # Other Technologies
-        'kafka', 'rabbitmq', 'apache', 'nginx', 'linux', 'ubuntu', 'centos',
-        'bash', 'shell scripting', 'powershell', 'jira', 'confluence',
-        'blockchain', 'ethereum', 'solidity', 'web3', 'solana',
-        'sap', 'erp', 'crm', 'salesforce', 'seo', 'sem'
-    ]
+class ResumeText:
+    """
+    One resume's text, prepared once and shared by all extractors:
+    lowercased and newline-flattened views plus the offsets of every
+    section heading, found in a single scan.
+    """
     
-    text_lower = text.lower()
-    found_skills = set()
+    def __init__(self, text: str):
+        self.text = text
+        self.lower = text.lower()
+        self.flat = text.replace('\n', ' ')
+        self._headings = None
     
-    # Use more sophisticated matching
-    for skill in skills_keywords:
-        # Match whole words or common variations
-        patterns = [
-            r'\b' + re.escape(skill) + r'\b',
-            r'\b' + re.escape(skill.replace(' ', '')) + r'\b',  # Remove spaces
-            r'\b' + re.escape(skill.replace('-', '')) + r'\b',  # Remove hyphens
-        ]
-        
-        for pattern in patterns:
-            if re.search(pattern, text_lower):
-                # Use original casing from text if possible
-                found_skills.add(skill.title())
-                break
+    @property
+    def headings(self) -> Dict[str, List[int]]:
+        """Heading keyword -> sorted start offsets in the lowercased text"""
+        if self._headings is None:
+            headings: Dict[str, List[int]] = {}
+            for match in _HEADING_PATTERN.finditer(self.lower):
+                headings.setdefault(match.group(1), []).append(match.start())
+            self._headings = headings
+        return self._headings
+
+
+def _as_resume_text(text: Union[str, ResumeText]) -> ResumeText:
+    return text if isinstance(text, ResumeText) else ResumeText(text)
+
+
+# Multiple keywords for experience section
+EXPERIENCE_KEYWORDS = [
+    'professional experience', 'work experience', 'experience',
+    'employment history', 'work history', 'career history',
+    'professional background'
+]
+
+# Headings that end the experience section
+SECTION_END_KEYWORDS = ['education', 'skills', 'certifications', 'projects', 'achievements']
+
+# Zero-width so overlapping headings ("work experience" / "experience") are all found
+_HEADING_PATTERN = re.compile(
+    r'(?=\b(' + '|'.join(re.escape(k) for k in EXPERIENCE_KEYWORDS + SECTION_END_KEYWORDS) + r')\b)'
+)
+
+
+def extract_skills(text: Union[str, ResumeText]) -> str:
+    """Extract technical skills with better accuracy"""
+    resume = _as_resume_text(text)
+    # Single pass over the text with the precompiled skill dictionary
+    found_skills = {skill.title() for skill in SKILL_MATCHER.find(resume.lower)}
     
     return ", ".join(sorted(found_skills)) if found_skills else "Not specified"
 
 
-def extract_experience(text: str) -> str:
+# Fallback: look for company names and dates
+# Pattern: Company Name (Year-Year) or (Month Year - Month Year)
+_EXPERIENCE_DATE_PATTERNS = [
+    re.compile(r'[A-Z][a-z\s&,\.]+(?:\([0-9]{4}\s*-\s*(?:[0-9]{4}|Present|Current)\))', re.MULTILINE),
+    re.compile(r'[A-Z][a-z\s&,\.]+\n.*?[0-9]{4}\s*-\s*(?:[0-9]{4}|Present|Current)', re.MULTILINE),
+]
+
+
+def extract_experience(text: Union[str, ResumeText]) -> str:
     """Extract work experience with better section detection"""
-    text_lower = text.lower()
-    
-    # Multiple keywords for experience section
-    experience_keywords = [
-        'professional experience', 'work experience', 'experience',
-        'employment history', 'work history', 'career history',
-        'professional background'
-    ]
+    resume = _as_resume_text(text)
+    headings = resume.headings
     
     # Try to find the experience section
-    for keyword in experience_keywords:
-        pattern = r'\b' + re.escape(keyword) + r'\b'
-        match = re.search(pattern, text_lower)
+    for keyword in EXPERIENCE_KEYWORDS:
+        if keyword not in headings:
+            continue
+        start_idx = headings[keyword][0]
         
-        if match:
-            start_idx = match.start()
-            
-            # Find where experience section ends (look for next major section)
-            end_keywords = ['education', 'skills', 'certifications', 'projects', 'achievements']
-            end_idx = len(text)
-            
-            for end_keyword in end_keywords:
-                end_pattern = r'\b' + re.escape(end_keyword) + r'\b'
-                end_match = re.search(end_pattern, text_lower[start_idx + 100:])  # Skip first 100 chars
-                if end_match:
-                    potential_end = start_idx + 100 + end_match.start()
-                    end_idx = min(end_idx, potential_end)
-            
-            experience_text = text[start_idx:end_idx]
-            
-            # Limit to reasonable length
-            if len(experience_text) > 2000:
-                experience_text = experience_text[:2000] + "..."
-            
-            return experience_text.strip()
-    
-    # Fallback: look for company names and dates
-    # Pattern: Company Name (Year-Year) or (Month Year - Month Year)
-    date_patterns = [
-        r'[A-Z][a-z\s&,\.]+(?:\([0-9]{4}\s*-\s*(?:[0-9]{4}|Present|Current)\))',
-        r'[A-Z][a-z\s&,\.]+\n.*?[0-9]{4}\s*-\s*(?:[0-9]{4}|Present|Current)'
-    ]
+        # Find where experience section ends (next major section, skipping the first 100 chars)
+        end_idx = len(resume.text)
+        for end_keyword in SECTION_END_KEYWORDS:
+            positions = headings.get(end_keyword, [])
+            i = bisect.bisect_left(positions, start_idx + 100)
+            if i < len(positions):
+                end_idx = min(end_idx, positions[i])
+        
+        experience_text = resume.text[start_idx:end_idx]
+        
+        # Limit to reasonable length
+        if len(experience_text) > 2000:
+            experience_text = experience_text[:2000] + "..."
+        
+        return experience_text.strip()
     
     experience_matches = []
-    for pattern in date_patterns:
-        matches = re.findall(pattern, text, re.MULTILINE)
-        experience_matches.extend(matches)
+    for pattern in _EXPERIENCE_DATE_PATTERNS:
+        experience_matches.extend(pattern.findall(resume.text))
     
     if experience_matches:
         return " | ".join(experience_matches[:5])  # Top 5 experiences
@@ -189,41 +233,73 @@ def extract_experience(text: str) -> str:
     return "Not specified"
 
 
-def extract_education(text: str) -> str:
-    """Extract education with better accuracy"""
-    education_patterns = [
-        # Degree patterns
-        r'(B\.?Tech|Bachelor of Technology|B\.?E\.?|Bachelor of Engineering)\s+in\s+[\w\s]+',
-        r'(M\.?Tech|Master of Technology|M\.?E\.?|Master of Engineering)\s+in\s+[\w\s]+',
-        r'(MBA|Master of Business Administration)',
-        r'(Ph\.?D\.?|Doctor of Philosophy)\s+in\s+[\w\s]+',
-        r'(B\.?Sc\.?|Bachelor of Science)\s+in\s+[\w\s]+',
-        r'(M\.?Sc\.?|Master of Science)\s+in\s+[\w\s]+',
-        r'(BCA|Bachelor of Computer Applications)',
-        r'(MCA|Master of Computer Applications)',
-        
-        # Institution patterns
-        r'(IIT|Indian Institute of Technology)\s+[\w\s]+',
-        r'(NIT|National Institute of Technology)\s+[\w\s]+',
-        r'(IIIT|Indian Institute of Information Technology)\s+[\w\s]+',
-        r'University\s+of\s+[\w\s]+',
-        r'[\w\s]+\s+University',
-        r'[\w\s]+\s+College'
-    ]
+_EDUCATION_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in [
+    # Degree patterns
+    r'(B\.?Tech|Bachelor of Technology|B\.?E\.?|Bachelor of Engineering)\s+in\s+[\w\s]+',
+    r'(M\.?Tech|Master of Technology|M\.?E\.?|Master of Engineering)\s+in\s+[\w\s]+',
+    r'(MBA|Master of Business Administration)',
+    r'(Ph\.?D\.?|Doctor of Philosophy)\s+in\s+[\w\s]+',
+    r'(B\.?Sc\.?|Bachelor of Science)\s+in\s+[\w\s]+',
+    r'(M\.?Sc\.?|Master of Science)\s+in\s+[\w\s]+',
+    r'(BCA|Bachelor of Computer Applications)',
+    r'(MCA|Master of Computer Applications)',
+    
+    # Institution patterns
+    r'(IIT|Indian Institute of Technology)\s+[\w\s]+',
+    r'(NIT|National Institute of Technology)\s+[\w\s]+',
+    r'(IIIT|Indian Institute of Information Technology)\s+[\w\s]+',
+    r'University\s+of\s+[\w\s]+',
+]]
+
+# "<words> University" / "<words> College": the regex form r'[\w\s]+\s+University'
+# backtracks quadratically, so these are matched per run of word/space characters
+_WORD_RUN = re.compile(r'[\w\s]+')
+_INSTITUTION_SUFFIXES = [re.compile(r'\s' + suffix, re.IGNORECASE) for suffix in ['University', 'College']]
+
+
+def _education_spans(resume: ResumeText) -> List[Tuple[int, int]]:
+    """
+    (start, length) of each education match, in pattern order
+    Repeats of an already matched text (e.g. "mba" inside "Bombay") are skipped
+    """
+    text = resume.flat
+    spans = []
+    seen = set()
+    
+    def add(start: int, end: int):
+        key = text[start:end].lower()
+        if key not in seen:
+            seen.add(key)
+            spans.append((start, end - start))
+    
+    for pattern in _EDUCATION_PATTERNS:
+        # Patterns with a group report the degree/institute name itself
+        group = 1 if pattern.groups else 0
+        for match in pattern.finditer(text):
+            add(match.start(group), match.end(group))
     
-    text_clean = text.replace('\n', ' ')
+    for suffix in _INSTITUTION_SUFFIXES:
+        for run in _WORD_RUN.finditer(text):
+            # Greedy regex semantics: from the run start up to the last suffix that
+            # has whitespace and at least one more character before it
+            last = None
+            for match in suffix.finditer(text, run.start() + 1, run.end()):
+                last = match
+            if last is not None:
+                add(run.start(), last.end())
+    return spans
+
+
+def extract_education(text: Union[str, ResumeText]) -> str:
+    """Extract education with better accuracy"""
+    resume = _as_resume_text(text)
+    text_clean = resume.flat
     education_parts = []
     
-    for pattern in education_patterns:
-        matches = re.findall(pattern, text_clean, re.IGNORECASE)
-        for match in matches:
-            if isinstance(match, tuple):
-                match = ' '.join(match)
-            # Get context around match
-            match_pos = text_clean.lower().find(match.lower())
-            if match_pos != -1:
-                context = text_clean[max(0, match_pos-50):min(len(text_clean), match_pos+len(match)+100)]
-                education_parts.append(context.strip())
+    for match_pos, match_len in _education_spans(resume):
+        # Get context around match
+        context = text_clean[max(0, match_pos-50):min(len(text_clean), match_pos+match_len+100)]
+        education_parts.append(context.strip())
     
     if education_parts:
         # Remove duplicates while preserving order
@@ -240,26 +316,29 @@ def extract_education(text: str) -> str:
     return "Not specified"
 
 
-def extract_years_of_experience(text: str) -> str:
+_YEARS_PATTERNS = [re.compile(pattern) for pattern in [
+    r'(\d+)\+?\s*years?\s+of\s+(?:professional\s+)?experience',
+    r'(?:professional\s+)?experience\s*:?\s*(\d+)\+?\s*years?',
+    r'(\d+)\+?\s*yrs?\s+(?:of\s+)?experience',
+    r'total\s+experience\s*:?\s*(\d+)\+?\s*years?',
+]]
+_YEAR_RANGE_PATTERN = re.compile(r'(\d{4})\s*-\s*(?:(\d{4})|present|current)')
+
+
+def extract_years_of_experience(text: Union[str, ResumeText]) -> str:
     """Extract years of experience more accurately"""
-    patterns = [
-        r'(\d+)\+?\s*years?\s+of\s+(?:professional\s+)?experience',
-        r'(?:professional\s+)?experience\s*:?\s*(\d+)\+?\s*years?',
-        r'(\d+)\+?\s*yrs?\s+(?:of\s+)?experience',
-        r'total\s+experience\s*:?\s*(\d+)\+?\s*years?',
-    ]
-    
-    text_lower = text.lower()
+    resume = _as_resume_text(text)
+    text_lower = resume.lower
     
-    for pattern in patterns:
-        matches = re.findall(pattern, text_lower)
-        if matches:
-            years = matches[0]
+    for pattern in _YEARS_PATTERNS:
+        match = pattern.search(text_lower)
+        if match:
+            years = match.group(1)
             return f"{years} years"
     
     # Try to calculate from experience section
     # Look for date ranges like "2018 - 2023" or "Jan 2018 - Present"
-    year_ranges = re.findall(r'(\d{4})\s*-\s*(?:(\d{4})|present|current)', text_lower)
+    year_ranges = _YEAR_RANGE_PATTERN.findall(text_lower)
     
     if year_ranges:
         total_years = 0
@@ -283,24 +362,32 @@ def process_resume(file_path: str) -> Dict:
     """
     # Extract text based on file type
     if file_path.endswith('.pdf'):
-        raw_text = extract_text_from_pdf(file_path)
+        with span("resume.pdf_text"):
+            raw_text = extract_text_from_pdf(file_path)
     elif file_path.endswith('.docx'):
-        raw_text = extract_text_from_docx(file_path)
+        with span("resume.docx_text"):
+            raw_text = extract_text_from_docx(file_path)
     else:
         raise ValueError("Unsupported file format. Only PDF and DOCX allowed.")
     
     if not raw_text or len(raw_text.strip()) < 50:
         raise ValueError("Could not extract meaningful text from resume")
     
+    # Lowercasing and section detection happen once for all extractors
+    resume = ResumeText(raw_text)
+    
     # Extract all information
-    extracted_data = {
-        "raw_text": raw_text.strip(),
-        "email": extract_email(raw_text),
-        "phone": extract_phone(raw_text),
-        "skills": extract_skills(raw_text),
-        "experience": extract_experience(raw_text),
-        "education": extract_education(raw_text),
-        "years_of_experience": extract_years_of_experience(raw_text),
-    }
+    extracted_data = {"raw_text": raw_text.strip()}
+    with span("resume.contact"):
+        extracted_data["email"] = extract_email(raw_text)
+        extracted_data["phone"] = extract_phone(raw_text)
+    with span("resume.skills"):
+        extracted_data["skills"] = extract_skills(resume)
+    with span("resume.experience"):
+        extracted_data["experience"] = extract_experience(resume)
+    with span("resume.education"):
+        extracted_data["education"] = extract_education(resume)
+    with span("resume.years"):
+        extracted_data["years_of_experience"] = extract_years_of_experience(resume)
     
     return extracted_data
\ No newline at end of file
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from .cache import LRUCache
+
+
+class ScoreCache:
+    """
+    Cache for deterministic (temperature 0) LLM scores.
+    Keys hash the exact prompt inputs and the model name, so a changed
+    profile or job text simply misses. Scores live in an in-memory LRU and,
+    with a db_path, in a SQLite table that survives restarts. Both tiers
+    expire entries after ttl seconds.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, maxsize: int = 10000,
+                 ttl: float = 7 * 24 * 3600):
+        self.ttl = ttl
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._conn = None
+        self._lock = threading.Lock()
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            with self._lock, self._conn:
+                self._conn.execute(
+                    """CREATE TABLE IF NOT EXISTS llm_scores (
+                        key TEXT PRIMARY KEY,
+                        score INTEGER NOT NULL,
+                        user_id TEXT,
+                        expires_at REAL NOT NULL
+                    )"""
+                )
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS llm_scores_user_id ON llm_scores (user_id)"
+                )
+
+    @staticmethod
+    def key(kind: str, model_name: str, inputs: Dict) -> str:
+        payload = json.dumps([kind, model_name, inputs], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[int]:
+        score = self.memory.get(key)
+        if score is not None or self._conn is None:
+            return score
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT score, expires_at FROM llm_scores WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        score, expires_at = row
+        remaining = expires_at - time.time()
+        if remaining <= 0:
+            return None
+        self.memory.set(key, score, ttl=remaining)
+        return score
+
+    def set(self, key: str, score: int, user_id: Optional[str] = None):
+        self.memory.set(key, score)
+        if self._conn is None:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_scores (key, score, user_id, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, score, user_id, time.time() + self.ttl)
+            )
+
+    def invalidate_user(self, user_id: str):
+        """
+        Drop persisted scores for a profile that changed.
+        Their keys can no longer be produced, so this only reclaims space;
+        stale memory entries age out of the LRU on their own.
+        """
+        if self._conn is None:
+            return
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_scores WHERE user_id = ?", (user_id,))
+            self._conn.execute("DELETE FROM llm_scores WHERE expires_at <= ?", (time.time(),))
+
+    def stats(self) -> Dict:
+        return self.memory.stats()
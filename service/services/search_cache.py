@@ -0,0 +1,38 @@
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .cache import LRUCache
+
+
+class SearchResultCache:
+    """
+    Finished search results keyed by normalized query, filter and the
+    VectorDB version. Any candidate upsert bumps the version, so older
+    entries are never hit again and age out of the LRU. Upserts made by
+    other processes are only picked up once entries expire (ttl).
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300):
+        self.entries = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    @staticmethod
+    def key(query: str, filter: Optional[Dict], version: int) -> Tuple[int, str, str]:
+        return version, " ".join(query.lower().split()), json.dumps(filter, sort_keys=True)
+
+    def get(self, key: Tuple) -> Optional[Tuple[List[Dict], float]]:
+        """(results, age in seconds) or None"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        results, created_at = entry
+        return results, time.monotonic() - created_at
+
+    def set(self, key: Tuple, results: List[Dict]):
+        self.entries.set(key, (results, time.monotonic()))
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> Dict:
+        return self.entries.stats()
@@ -0,0 +1,137 @@
+import re
+from typing import Any, Dict, List, Optional
+
+from .lexical_index import split_skills
+
+# Minimum education levels accepted by search filters, lowest first
+EDUCATION_LEVELS = {"high_school": 1, "associate": 2, "bachelor": 3, "master": 4, "phd": 5}
+
+# Highest degree wins; checked from the top down
+_EDUCATION_RANKS = [(EDUCATION_LEVELS[level], re.compile(pattern, re.IGNORECASE)) for level, pattern in [
+    ("phd", r'\bph\.?\s?d\b|doctor of philosophy|doctorate'),
+    ("master", r'\bmaster|\bm\.?\s?tech\b|\bm\.?\s?sc\b|\bm\.e\b|\bmba\b|\bmca\b|\bm\.?s\.?\s+in\b'),
+    ("bachelor", r'\bbachelor|\bb\.?\s?tech\b|\bb\.?\s?sc\b|\bb\.e\b|\bbca\b|\bb\.?s\.?\s+in\b|\bb\.?a\.?\s+in\b'),
+    ("associate", r'\bassociate\b|\bdiploma\b'),
+    ("high_school", r'high school|secondary school|\bhsc\b|\bssc\b'),
+]]
+
+# The normalized fields that metadata filters can target
+FILTER_FIELDS = ("skills_list", "years_exp_num", "education_rank")
+
+_NUMBER = re.compile(r'\d+(?:\.\d+)?')
+
+
+def years_number(years_of_experience: Any) -> Optional[float]:
+    """"5 years" -> 5.0; None when the resume didn't say"""
+    if isinstance(years_of_experience, (int, float)):
+        return float(years_of_experience)
+    match = _NUMBER.search(years_of_experience or "")
+    return float(match.group(0)) if match else None
+
+
+def education_rank(education: str) -> int:
+    """Highest degree mentioned as an EDUCATION_LEVELS rank, 0 if none is recognized"""
+    for rank, pattern in _EDUCATION_RANKS:
+        if pattern.search(education or ""):
+            return rank
+    return 0
+
+
+def normalized_fields(profile: Dict) -> Dict:
+    """
+    Filterable forms of the free-text profile fields, stored next to them
+    in MongoDB and in the vector index metadata
+    """
+    fields = {
+        "skills_list": split_skills(profile.get('skills') or ""),
+        "education_rank": education_rank(profile.get('education') or ""),
+    }
+    years = years_number(profile.get('years_of_experience'))
+    # Pinecone metadata can't hold nulls; a missing field fails every range filter
+    if years is not None:
+        fields["years_exp_num"] = years
+    return fields
+
+
+def build_metadata_filter(min_years: Optional[float] = None, max_years: Optional[float] = None,
+                          skills: Optional[List[str]] = None,
+                          education: Optional[str] = None) -> Optional[Dict]:
+    """
+    Pinecone-style metadata filter for the search filters, None when there are none
+    Raises ValueError for an unknown education level
+    """
+    clauses = []
+    years = {}
+    if min_years is not None:
+        years["$gte"] = float(min_years)
+    if max_years is not None:
+        years["$lte"] = float(max_years)
+    if years:
+        clauses.append({"years_exp_num": years})
+    # $in on a list field matches when the list holds the value, so one clause per skill
+    for skill in split_skills(",".join(skills or [])):
+        clauses.append({"skills_list": {"$in": [skill]}})
+    if education:
+        level = education.strip().lower().replace(" ", "_")
+        if level not in EDUCATION_LEVELS:
+            raise ValueError(f"Unknown education level: {education} (expected one of {', '.join(EDUCATION_LEVELS)})")
+        clauses.append({"education_rank": {"$gte": EDUCATION_LEVELS[level]}})
+
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def _matches_condition(value: Any, condition: Any) -> bool:
+    if not isinstance(condition, dict):
+        condition = {"$eq": condition}
+    values = value if isinstance(value, list) else [value]
+    for op, operand in condition.items():
+        if op == "$exists":
+            if (value is not None) != bool(operand):
+                return False
+            continue
+        if op == "$ne":
+            if operand in values:
+                return False
+            continue
+        if op == "$nin":
+            if any(v in operand for v in values):
+                return False
+            continue
+        if value is None:
+            return False
+        if op == "$eq":
+            ok = operand in values
+        elif op == "$in":
+            ok = any(v in operand for v in values)
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            if isinstance(value, list) or not isinstance(value, (int, float)):
+                return False
+            ok = {
+                "$gt": value > operand,
+                "$gte": value >= operand,
+                "$lt": value < operand,
+                "$lte": value <= operand,
+            }[op]
+        else:
+            raise ValueError(f"Unsupported filter operator: {op}")
+        if not ok:
+            return False
+    return True
+
+
+def matches_filter(metadata: Dict, filter: Optional[Dict]) -> bool:
+    """Evaluate a Pinecone metadata filter against one record's metadata (local backend)"""
+    if not filter:
+        return True
+    for field, condition in filter.items():
+        if field == "$and":
+            if not all(matches_filter(metadata, clause) for clause in condition):
+                return False
+        elif field == "$or":
+            if not any(matches_filter(metadata, clause) for clause in condition):
+                return False
+        elif not _matches_condition(metadata.get(field), condition):
+            return False
+    return True
@@ -1,13 +1,37 @@
 import google.generativeai as genai
+import numpy as np
+import contextvars
+import functools
+import json
+import logging
 import os
-from typing import List, Dict
-from .vector_db import VectorDB
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from .vector_db import VectorDB, build_candidate_text
+from .lexical_index import parse_skill_query, reciprocal_rank_fusion, split_skills
 from .profile_manager import ProfileManager
+from .metrics import span
+from .score_cache import ScoreCache
+from .search_cache import SearchResultCache
+from .search_filters import matches_filter
+from .skill_matcher import build_default_matcher
+
+logger = logging.getLogger(__name__)
+
+LLM_MODEL_NAME = 'gemini-2.5-flash'
+
+# Profile fields used by search results and relevancy prompts (no raw_text)
+SEARCH_PROFILE_FIELDS = ['user_id', 'name', 'email', 'skills', 'experience', 'education',
+                         'years_of_experience', 'resume_url']
 
 class SemanticSearch:
-    def __init__(self, vector_db: VectorDB):
+    def __init__(self, vector_db: VectorDB, profile_manager: Optional[ProfileManager] = None):
         self.vector_db = vector_db
-        self.profile_manager = ProfileManager()
+        # Share the caller's ProfileManager so profile cache invalidations are seen here
+        self.profile_manager = profile_manager if profile_manager is not None else ProfileManager()
         
         # Configure Gemini with temperature=0 for deterministic outputs
         genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
@@ -21,78 +45,448 @@ class SemanticSearch:
         )
         
         self.model = genai.GenerativeModel(
-            'gemini-2.5-flash',
+            LLM_MODEL_NAME,
             generation_config=self.generation_config
         )
+        
+        # Same inputs + temperature 0 => same score, so scores are cached
+        self.score_cache = ScoreCache(
+            db_path=os.getenv("LLM_SCORE_CACHE_PATH", "data/llm_scores.sqlite3") or None,
+            maxsize=int(os.getenv("LLM_SCORE_CACHE_SIZE", "10000")),
+            ttl=float(os.getenv("LLM_SCORE_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+        )
+        
+        # Re-ranking fans out over a bounded pool with per-call and overall time limits
+        self.llm_pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            thread_name_prefix="llm"
+        )
+        self.llm_call_timeout = float(os.getenv("LLM_CALL_TIMEOUT_SECONDS", "15"))
+        self.llm_deadline = float(os.getenv("LLM_DEADLINE_SECONDS", "20"))
+        
+        # "batch" packs up to LLM_BATCH_SIZE candidates (or jobs) into one prompt
+        self.scoring_mode = os.getenv("LLM_SCORING_MODE", "single").lower()
+        self.scoring_batch_size = int(os.getenv("LLM_BATCH_SIZE", "10"))
+        
+        # Batch job matching scores every job by embedding similarity and only
+        # refines the JOB_MATCH_LLM_TOP_K best with the LLM (negative = all jobs)
+        self.job_match_llm_top_k = int(os.getenv("JOB_MATCH_LLM_TOP_K", "10"))
+        self.job_match_similarity_floor = float(os.getenv("JOB_MATCH_SIMILARITY_FLOOR", "0.1"))
+        self.job_match_similarity_ceiling = float(os.getenv("JOB_MATCH_SIMILARITY_CEILING", "0.7"))
+        
+        # "hybrid" fuses BM25 and vector rankings and answers pure skill queries
+        # from the skill postings; "vector" is the plain similarity top-k
+        self.retrieval_mode = os.getenv("SEARCH_RETRIEVAL", "hybrid").lower()
+        self.skill_matcher = build_default_matcher()
+        # Only the best SEARCH_LLM_TOP_K retrieved candidates are re-ranked by the LLM (negative = all)
+        self.search_llm_top_k = int(os.getenv("SEARCH_LLM_TOP_K", "10"))
+        
+        # Finished results for repeated searches, dropped whenever a candidate is upserted
+        self.result_cache = SearchResultCache(
+            maxsize=int(os.getenv("SEARCH_CACHE_SIZE", "256")),
+            ttl=float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "300")),
+        )
     
-    def search(self, query: str) -> List[Dict]:
+    def search(self, query: str, filter: Optional[Dict] = None) -> List[Dict]:
         """
         Semantic search with AI-powered relevancy
-        Returns exact matches with scores
+        Returns exact matches with scores; filter is a metadata filter from
+        search_filters.build_metadata_filter, applied before any scoring
         """
-        # Search in vector DB
-        matches = self.vector_db.search(query, top_k=20)  # Get more candidates
+        return self._search(query, filter)[0]
+    
+    def cached_search(self, query: str, filter: Optional[Dict] = None) -> Tuple[List[Dict], Optional[float]]:
+        """
+        search() through the result cache
+        Returns (results, age in seconds of the cached entry, None when computed now)
+        """
+        # Taken before searching: an upsert during the search makes this entry unreachable
+        key = self.result_cache.key(query, filter, self.vector_db.version)
+        with span("search.cache"):
+            cached = self.result_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        results, complete = self._search(query, filter)
+        # Results with LLM calls that timed out are not kept
+        if complete:
+            self.result_cache.set(key, results)
+        return results, None
+    
+    def search_events(self, query: str, filter: Optional[Dict] = None,
+                      cancel: Optional[threading.Event] = None) -> Iterator[Dict]:
+        """
+        Progressive search() for streaming responses. Yields:
+        - "candidates": every retrieved candidate ranked by vector score, right away
+        - "score": one per LLM score as it lands, with the candidate's new final_score
+        - "done": the final top 10, exactly what cached_search() would return
+        A cache hit yields only "done". Setting cancel (from any thread) skips
+        the LLM calls not yet started and ends the stream without "done".
+        """
+        key = self.result_cache.key(query, filter, self.vector_db.version)
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            results, age = cached
+            yield {"event": "done", "results": results, "cache_hit": True, "cache_age_seconds": round(age, 1)}
+            return
+        
+        candidates = self._candidates(query, filter)
+        results = [
+            self._build_result(user_id, similarity_score, profile, None)
+            for user_id, similarity_score, profile in candidates
+        ]
+        yield {"event": "candidates", "results": self._rank(results, len(results))}
+        
+        complete = True
+        relevancy_scores = self._iter_relevancy_scores(query, candidates, cancel)
+        try:
+            for index, relevancy_score in relevancy_scores:
+                if relevancy_score is None:
+                    # Timed out; the candidate keeps its vector score
+                    complete = False
+                    continue
+                results[index] = self._build_result(*candidates[index], relevancy_score)
+                yield {
+                    "event": "score",
+                    "user_id": results[index]["user_id"],
+                    "ai_relevancy": results[index]["ai_relevancy"],
+                    "ai_scored": True,
+                    "final_score": results[index]["final_score"],
+                }
+        finally:
+            # Closing the stream stops the scoring still queued
+            relevancy_scores.close()
+        if cancel is not None and cancel.is_set():
+            return
+        
+        results = self._rank(results)
+        if complete:
+            self.result_cache.set(key, results)
+        yield {"event": "done", "results": results, "cache_hit": False, "cache_age_seconds": None}
+    
+    def _search(self, query: str, filter: Optional[Dict]) -> Tuple[List[Dict], bool]:
+        """Results, and whether every shortlisted candidate got its LLM score"""
+        candidates = self._candidates(query, filter)
+        relevancy_scores: List[Optional[int]] = [None] * len(candidates)
+        for index, relevancy_score in self._iter_relevancy_scores(query, candidates):
+            relevancy_scores[index] = relevancy_score
+        top_k = self._llm_shortlist_size(len(candidates))
+        complete = all(score is not None for score in relevancy_scores[:top_k])
+        
+        results = [
+            self._build_result(user_id, similarity_score, profile, relevancy_score)
+            for (user_id, similarity_score, profile), relevancy_score
+            in zip(candidates, relevancy_scores)
+        ]
+        return self._rank(results), complete
+    
+    def _candidates(self, query: str, filter: Optional[Dict]) -> List[Tuple[str, float, Dict]]:
+        """(user_id, vector score, profile) for the retrieved candidates, best first"""
+        matches = self.retrieve(query, top_k=20, filter=filter)  # Get more candidates
         
         if not matches:
             return []
         
-        # Get full profiles and calculate relevancy
-        results = []
+        # Get the profiles for all candidates worth scoring in one MongoDB query
+        profiles = self.profile_manager.get_profiles(
+            [match['id'] for match in matches], fields=SEARCH_PROFILE_FIELDS
+        )
         
-        for match in matches:
-            user_id = match['id']
-            similarity_score = match.get('score', 0)
-            
+        return [
+            (match['id'], match.get('score', 0), profiles[match['id']])
+            for match in matches
+            if match['id'] in profiles
+        ]
+    
+    def _llm_shortlist_size(self, count: int) -> int:
+        return min(count, self.search_llm_top_k) if self.search_llm_top_k >= 0 else count
+    
+    def _iter_relevancy_scores(self, query: str, candidates: List[Tuple[str, float, Dict]],
+                               cancel: Optional[threading.Event] = None) -> Iterator[Tuple[int, Optional[int]]]:
+        """
+        AI relevancy for the shortlist, scored concurrently and yielded as
+        (candidate index, score) when ready; the rest keep their vector score
+        """
+        top_k = self._llm_shortlist_size(len(candidates))
+        return self._iter_item_scores(
+            [profile for _, _, profile in candidates[:top_k]],
+            functools.partial(self.calculate_ai_relevancy, query),
+            functools.partial(self.calculate_ai_relevancy_batch, query),
+            cancel,
+        )
+    
+    @staticmethod
+    def _rank(results: List[Dict], limit: int = 10) -> List[Dict]:
+        # Sort by final score (highest first) and return the top matches
+        return sorted(results, key=lambda x: x['final_score'], reverse=True)[:limit]
+    
+    def retrieve(self, query: str, top_k: int = 20, filter: Optional[Dict] = None) -> List[Dict]:
+        """
+        Candidate {"id", "score"} matches for a query, best first; score is the
+        vector similarity. Vector hits need similarity >= 0.3, lexical hits don't.
+        Only candidates whose index metadata passes filter are returned.
+        """
+        lexical_index = self.vector_db.lexical_index
+        if self.retrieval_mode != "hybrid" or not len(lexical_index):
+            matches = self.vector_db.search(query, top_k=top_k, filter=filter)
             # Only consider high similarity candidates (>0.3)
-            if similarity_score < 0.3:
-                continue
-            
-            # Get full profile from MongoDB
-            profile = self.profile_manager.get_profile(user_id)
-            
-            if not profile:
-                continue
-            
-            # Calculate AI relevancy
-            relevancy_score = self.calculate_ai_relevancy(query, profile)
-            
-            # Combine scores: 60% vector similarity + 40% AI relevancy
-            combined_score = (similarity_score * 0.6) + (relevancy_score / 100 * 0.4)
-            
-            results.append({
-                "user_id": user_id,
-                "name": profile.get('name', 'Unknown'),
-                "email": profile.get('email', ''),
-                "skills": profile.get('skills', ''),
-                "experience": profile.get('experience', '')[:200],  # Preview
-                "education": profile.get('education', ''),
-                "years_experience": profile.get('years_of_experience', ''),
-                "resume_url": profile.get('resume_url', ''),
-                "vector_score": round(similarity_score * 100, 2),
-                "ai_relevancy": relevancy_score,
-                "final_score": round(combined_score * 100, 2),
-            })
-        
-        # Sort by final score (highest first)
-        results.sort(key=lambda x: x['final_score'], reverse=True)
-        
-        # Return top 10 matches
-        return results[:10]
+            return [match for match in matches if match.get('score', 0) >= 0.3]
+        
+        # A query made only of known skills ("kafka golang") is answered by
+        # intersecting skill postings, then ordered by vector similarity
+        with span("search.lexical"):
+            skills = parse_skill_query(query, self.skill_matcher)
+            exact = lexical_index.with_all_skills(skills) if skills else set()
+            if exact and filter:
+                # Narrowed on the locally held filter fields; the index re-checks the filter on fetch
+                exact = lexical_index.select(exact, functools.partial(matches_filter, filter=filter))
+        # One vector query serves both the skill merge and the fusion below
+        vector_matches = self.vector_db.search(query, top_k=top_k, filter=filter)
+        if skills:
+            with span("search.lexical"):
+                # Very common skill combinations are narrowed by BM25 before fetching vectors
+                shortlist = [user_id for user_id, _ in lexical_index.bm25(
+                    " ".join(skills), top_k=5 * top_k, user_ids=exact
+                )] if exact else []
+            vector_scores = {match['id']: match.get('score', 0) for match in vector_matches}
+            scores = {user_id: vector_scores[user_id] for user_id in shortlist if user_id in vector_scores}
+            scores.update(self.vector_db.similarities(
+                query, [user_id for user_id in shortlist if user_id not in scores], filter=filter
+            ))
+            # Candidates written by other worker processes are missing from this
+            # process's postings; vector hits that have every skill are merged in
+            for match in vector_matches:
+                if match['id'] not in scores and set(skills) <= set(
+                    split_skills((match.get('metadata') or {}).get('skills', ''))
+                ):
+                    scores[match['id']] = match.get('score', 0)
+            if scores:
+                ranked = sorted(scores, key=scores.get, reverse=True)
+                return [{"id": user_id, "score": scores[user_id]} for user_id in ranked[:top_k]]
+        
+        # Otherwise fuse the vector and BM25 rankings
+        matches = [match for match in vector_matches if match.get('score', 0) >= 0.3]
+        with span("search.lexical"):
+            lexical = lexical_index.bm25(query, top_k=top_k)
+        
+        # Lexical hits get their similarity from the index, which also applies the filter
+        scores = {match['id']: match.get('score', 0) for match in matches}
+        scores.update(self.vector_db.similarities(
+            query, [user_id for user_id, _ in lexical if user_id not in scores], filter=filter
+        ))
+        fused = reciprocal_rank_fusion([
+            [match['id'] for match in matches],
+            [user_id for user_id, _ in lexical if user_id in scores],
+        ])
+        return [{"id": user_id, "score": scores[user_id]} for user_id, _ in fused[:top_k]]
+    
+    @staticmethod
+    def _build_result(user_id: str, similarity_score: float, profile: Dict,
+                      relevancy_score: Optional[int]) -> Dict:
+        """Search result row; without an AI score the vector similarity stands in for it"""
+        ai_scored = relevancy_score is not None
+        if not ai_scored:
+            relevancy_score = round(similarity_score * 100)
+        
+        # Combine scores: 60% vector similarity + 40% AI relevancy
+        combined_score = (similarity_score * 0.6) + (relevancy_score / 100 * 0.4)
+        
+        return {
+            "user_id": user_id,
+            "name": profile.get('name', 'Unknown'),
+            "email": profile.get('email', ''),
+            "skills": profile.get('skills', ''),
+            "experience": profile.get('experience', '')[:200],  # Preview
+            "education": profile.get('education', ''),
+            "years_experience": profile.get('years_of_experience', ''),
+            "resume_url": profile.get('resume_url', ''),
+            "vector_score": round(similarity_score * 100, 2),
+            "ai_relevancy": relevancy_score,
+            "ai_scored": ai_scored,
+            "final_score": round(combined_score * 100, 2),
+        }
+    
+    def embedding_job_scores(self, profile: Dict, job_requirements: List[str]) -> List[int]:
+        """
+        Fast 0-100 match scores from embedding similarity
+        All job texts are encoded in one batch and compared in one matrix product
+        """
+        if not job_requirements:
+            return []
+        candidate = np.asarray(self.vector_db.create_embedding(build_candidate_text(profile)), dtype=np.float32)
+        jobs = np.asarray(self.vector_db.create_embeddings(job_requirements), dtype=np.float32)
+        similarities = jobs @ candidate
+        
+        # Map cosine similarity linearly from [floor, ceiling] onto [0, 100]
+        floor, ceiling = self.job_match_similarity_floor, self.job_match_similarity_ceiling
+        scaled = (similarities - floor) / max(ceiling - floor, 1e-6) * 100
+        return [int(round(score)) for score in np.clip(scaled, 0, 100)]
+    
+    def calculate_job_matches(self, profile: Dict, job_requirements: List[str],
+                              refine: bool = True) -> List[Tuple[int, str]]:
+        """
+        Score one candidate against many jobs
+        Returns (score, source) per job where source is "embedding" or "llm";
+        only the top JOB_MATCH_LLM_TOP_K jobs by embedding score go to the LLM
+        """
+        scores = self.embedding_job_scores(profile, job_requirements)
+        sources = ["embedding"] * len(scores)
+        
+        top_k = self.job_match_llm_top_k if refine else 0
+        if top_k < 0:
+            top_k = len(scores)
+        shortlist = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:top_k]
+        
+        llm_scores = self._score_items(
+            [job_requirements[i] for i in shortlist],
+            functools.partial(self.calculate_job_match, profile),
+            functools.partial(self.calculate_job_match_batch, profile),
+        )
+        for i, score in zip(shortlist, llm_scores):
+            # Jobs whose LLM call timed out keep their embedding score
+            if score is not None:
+                scores[i] = score
+                sources[i] = "llm"
+        
+        return list(zip(scores, sources))
+    
+    def _score_items(self, items: List, score_one: Callable[[Any], int],
+                     score_batch: Callable[[List], List[int]]) -> List[Optional[int]]:
+        """Score items one prompt each, or in multi-item prompts when LLM_SCORING_MODE=batch"""
+        scores: List[Optional[int]] = [None] * len(items)
+        for index, score in self._iter_item_scores(items, score_one, score_batch):
+            scores[index] = score
+        return scores
+    
+    def _iter_item_scores(self, items: List, score_one: Callable[[Any], int],
+                          score_batch: Callable[[List], List[int]],
+                          cancel: Optional[threading.Event] = None) -> Iterator[Tuple[int, Optional[int]]]:
+        """_score_items yielding (item index, score) as each prompt finishes, None where it timed out"""
+        if self.scoring_mode != "batch":
+            yield from self._iter_concurrently([functools.partial(score_one, item) for item in items], cancel)
+            return
+        
+        size = max(1, self.scoring_batch_size)
+        starts = list(range(0, len(items), size))
+        calls = [functools.partial(score_batch, items[start:start + size]) for start in starts]
+        chunk_results = self._iter_concurrently(calls, cancel)
+        try:
+            for index, chunk_scores in chunk_results:
+                chunk_size = min(size, len(items) - starts[index])
+                for offset in range(chunk_size):
+                    yield starts[index] + offset, chunk_scores[offset] if chunk_scores is not None else None
+        finally:
+            chunk_results.close()
+    
+    def _iter_concurrently(self, calls: List[Callable[[], Any]],
+                           cancel: Optional[threading.Event] = None) -> Iterator[Tuple[int, Any]]:
+        """
+        Run scoring calls on the bounded LLM pool, yielding (index, score) as
+        they finish. Calls still running after LLM_CALL_TIMEOUT_SECONDS, or
+        unfinished at the LLM_DEADLINE_SECONDS deadline, yield None.
+        Once cancel is set, calls that haven't started are skipped and
+        iteration stops.
+        """
+        if not calls:
+            return
+        deadline = time.monotonic() + self.llm_deadline
+        started: Dict[int, float] = {}
+        
+        def run(index: int, call: Callable[[], Any]) -> Any:
+            # Checked in the pool thread, so cancelling doesn't wait for this generator to resume
+            if cancel is not None and cancel.is_set():
+                return None
+            started[index] = time.monotonic()
+            return call()
+        
+        # Each call gets its own context copy so its timing spans reach the request
+        pending = {
+            self.llm_pool.submit(contextvars.copy_context().run, run, index, call): index
+            for index, call in enumerate(calls)
+        }
+        
+        try:
+            while pending:
+                if cancel is not None and cancel.is_set():
+                    return
+                now = time.monotonic()
+                expired = [
+                    future for future, index in pending.items()
+                    if now >= deadline or (index in started and now - started[index] >= self.llm_call_timeout)
+                ]
+                for future in expired:
+                    # Cannot interrupt a running request; just stop waiting for it
+                    future.cancel()
+                    yield pending.pop(future), None
+                if not pending:
+                    break
+                
+                running = [started[index] for index in pending.values() if index in started]
+                next_expiry = min([deadline] + [t + self.llm_call_timeout for t in running])
+                done, _ = wait(list(pending), timeout=max(0.0, next_expiry - time.monotonic()),
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        yield index, future.result()
+                    except Exception as e:
+                        logger.warning("Error in concurrent LLM scoring: %s", e)
+                        yield index, None
+        finally:
+            # Closed early (e.g. a streaming client went away): drop queued calls
+            for future in pending:
+                future.cancel()
+    
+    @staticmethod
+    def _profile_inputs(profile: Dict) -> Dict:
+        """The profile fields that go into scoring prompts"""
+        return {
+            "skills": profile.get('skills', 'Not specified'),
+            "experience": profile.get('experience', 'Not specified')[:300],
+            "education": profile.get('education', 'Not specified'),
+            "years": profile.get('years_of_experience', 'Not specified'),
+        }
+    
+    @staticmethod
+    def _parse_score(score_text: str) -> Optional[int]:
+        """Extract number from response, clamped to 0-100"""
+        numbers = re.findall(r'\d+', score_text)
+        if numbers:
+            return max(0, min(100, int(numbers[0])))
+        return None
+    
+    def _cached_score(self, kind: str, inputs: Dict, prompt: str, user_id: Optional[str]) -> int:
+        """Score a prompt with Gemini, reusing cached scores for identical inputs"""
+        key = self.score_cache.key(kind, LLM_MODEL_NAME, inputs)
+        score = self.score_cache.get(key)
+        if score is not None:
+            return score
+        
+        with span(f"llm.{kind}"):
+            response = self.model.generate_content(prompt)
+        score = self._parse_score(response.text.strip())
+        
+        if score is None:
+            return 50  # Default if can't parse
+        
+        self.score_cache.set(key, score, user_id)
+        return score
     
     def calculate_ai_relevancy(self, query: str, profile: Dict) -> int:
         """
         Use Gemini to calculate exact relevancy (0-100)
         With temperature=0 for consistent results
         """
+        inputs = self._profile_inputs(profile)
         prompt = f"""You are an expert recruiter. Analyze if this candidate matches the requirement.
 
 REQUIREMENT: {query}
 
 CANDIDATE PROFILE:
-- Skills: {profile.get('skills', 'Not specified')}
-- Experience: {profile.get('experience', 'Not specified')[:300]}
-- Education: {profile.get('education', 'Not specified')}
-- Years of Experience: {profile.get('years_of_experience', 'Not specified')}
+- Skills: {inputs['skills']}
+- Experience: {inputs['experience']}
+- Education: {inputs['education']}
+- Years of Experience: {inputs['years']}
 
 INSTRUCTIONS:
 1. Rate how well this candidate matches the requirement (0-100)
@@ -108,23 +502,11 @@ INSTRUCTIONS:
 Respond with ONLY a number between 0-100. No explanation."""
 
         try:
-            response = self.model.generate_content(prompt)
-            score_text = response.text.strip()
-            
-            # Extract number from response
-            import re
-            numbers = re.findall(r'\d+', score_text)
-            
-            if numbers:
-                score = int(numbers[0])
-                # Ensure score is between 0-100
-                score = max(0, min(100, score))
-                return score
-            
-            return 50  # Default if can't parse
-            
+            return self._cached_score(
+                "relevancy", {"query": query, **inputs}, prompt, profile.get('user_id')
+            )
         except Exception as e:
-            print(f"Error calculating AI relevancy: {e}")
+            logger.warning("Error calculating AI relevancy: %s", e)
             return 50  # Default score on error
     
     def calculate_job_match(self, profile: Dict, job_requirements: str) -> int:
@@ -132,16 +514,17 @@ Respond with ONLY a number between 0-100. No explanation."""
         Calculate how well candidate matches a job
         With temperature=0 for consistent results
         """
+        inputs = self._profile_inputs(profile)
         prompt = f"""You are an expert recruiter. Rate how well this candidate matches the job requirement.
 
 JOB REQUIREMENT:
 {job_requirements}
 
 CANDIDATE PROFILE:
-- Skills: {profile.get('skills', 'Not specified')}
-- Experience: {profile.get('experience', 'Not specified')[:300]}
-- Education: {profile.get('education', 'Not specified')}
-- Years: {profile.get('years_of_experience', 'Not specified')}
+- Skills: {inputs['skills']}
+- Experience: {inputs['experience']}
+- Education: {inputs['education']}
+- Years: {inputs['years']}
 
 Rate 0-100. Consider:
 1. Skill match (most important)
@@ -152,17 +535,145 @@ Rate 0-100. Consider:
 Respond with ONLY a number between 0-100."""
 
         try:
-            response = self.model.generate_content(prompt)
-            score_text = response.text.strip()
-            
-            import re
-            numbers = re.findall(r'\d+', score_text)
-            
-            if numbers:
-                score = int(numbers[0])
-                return max(0, min(100, score))
-            
+            return self._cached_score(
+                "job_match", {"job": job_requirements, **inputs}, prompt, profile.get('user_id')
+            )
+        except Exception as e:
+            logger.warning("Error calculating job match: %s", e)
             return 50
+    
+    @staticmethod
+    def _parse_scores(score_text: str, count: int) -> Optional[List[int]]:
+        """Extract a JSON list of exactly `count` scores, clamped to 0-100"""
+        match = re.search(r'\[[\d\s,]*\]', score_text)
+        if not match:
+            return None
+        try:
+            scores = json.loads(match.group(0))
+        except ValueError:
+            return None
+        if len(scores) != count:
+            return None
+        return [max(0, min(100, int(score))) for score in scores]
+    
+    def _cached_batch_scores(self, kind: str, items_inputs: List[Dict], user_ids: List[Optional[str]],
+                             build_prompt: Callable[[List[int]], str],
+                             score_one: Callable[[int], int]) -> List[int]:
+        """
+        Score several items with one Gemini prompt
+        Cached items are skipped; on an unparseable reply each remaining item
+        is scored with its own single-item prompt
+        """
+        keys = [self.score_cache.key(kind, LLM_MODEL_NAME, inputs) for inputs in items_inputs]
+        scores = [self.score_cache.get(key) for key in keys]
+        todo = [i for i, score in enumerate(scores) if score is None]
+        if not todo:
+            return scores
+        
+        parsed = None
+        try:
+            batch_config = genai.GenerationConfig(
+                temperature=0,
+                top_p=1.0,
+                top_k=1,
+                max_output_tokens=8 * len(todo) + 16,  # "[NN, NN, ...]"
+            )
+            with span(f"llm.{kind}"):
+                response = self.model.generate_content(build_prompt(todo), generation_config=batch_config)
+            parsed = self._parse_scores(response.text.strip(), len(todo))
         except Exception as e:
-            print(f"Error calculating job match: {e}")
-            return 50
\ No newline at end of file
+            logger.warning("Error in batched %s scoring: %s", kind, e)
+        
+        if parsed is None:
+            logger.warning("Batched %s reply unusable, scoring %d items individually", kind, len(todo))
+            for i in todo:
+                scores[i] = score_one(i)
+            return scores
+        
+        for i, score in zip(todo, parsed):
+            scores[i] = score
+            self.score_cache.set(keys[i], score, user_ids[i])
+        return scores
+    
+    def calculate_ai_relevancy_batch(self, query: str, profiles: List[Dict]) -> List[int]:
+        """
+        Rate several candidates against one requirement in a single prompt
+        Returns one 0-100 score per profile, in order
+        """
+        items_inputs = [{"query": query, **self._profile_inputs(profile)} for profile in profiles]
+        
+        def build_prompt(todo: List[int]) -> str:
+            candidates = "\n\n".join(
+                f"""[{n}]
+- Skills: {items_inputs[i]['skills']}
+- Experience: {items_inputs[i]['experience']}
+- Education: {items_inputs[i]['education']}
+- Years of Experience: {items_inputs[i]['years']}"""
+                for n, i in enumerate(todo, start=1)
+            )
+            return f"""You are an expert recruiter. Analyze how well each candidate matches the requirement.
+
+REQUIREMENT: {query}
+
+CANDIDATES:
+{candidates}
+
+INSTRUCTIONS:
+1. Rate each candidate independently (0-100)
+2. Consider:
+   - Skill match (most important)
+   - Experience relevance
+   - Education background
+   - Years of experience
+3. Be strict: Only give 80+ for excellent matches
+4. Give 50-79 for good matches
+5. Give below 50 for poor matches
+
+Respond with ONLY a JSON array of {len(todo)} integers, one per candidate in the order given. No explanation."""
+        
+        return self._cached_batch_scores(
+            "relevancy_batch",
+            items_inputs,
+            [profile.get('user_id') for profile in profiles],
+            build_prompt,
+            lambda i: self.calculate_ai_relevancy(query, profiles[i]),
+        )
+    
+    def calculate_job_match_batch(self, profile: Dict, job_requirements: List[str]) -> List[int]:
+        """
+        Rate one candidate against several jobs in a single prompt
+        Returns one 0-100 score per job, in order
+        """
+        inputs = self._profile_inputs(profile)
+        items_inputs = [{"job": requirements, **inputs} for requirements in job_requirements]
+        
+        def build_prompt(todo: List[int]) -> str:
+            jobs = "\n\n".join(
+                f"[{n}]\n{job_requirements[i]}" for n, i in enumerate(todo, start=1)
+            )
+            return f"""You are an expert recruiter. Rate how well this candidate matches each job requirement.
+
+CANDIDATE PROFILE:
+- Skills: {inputs['skills']}
+- Experience: {inputs['experience']}
+- Education: {inputs['education']}
+- Years: {inputs['years']}
+
+JOB REQUIREMENTS:
+{jobs}
+
+Rate each job 0-100. Consider:
+1. Skill match (most important)
+2. Experience relevance
+3. Education background
+4. Years of experience
+
+Respond with ONLY a JSON array of {len(todo)} integers, one per job in the order given."""
+        
+        return self._cached_batch_scores(
+            "job_match_batch",
+            items_inputs,
+            [profile.get('user_id')] * len(job_requirements),
+            build_prompt,
+            lambda i: self.calculate_job_match(profile, job_requirements[i]),
+        )
@@ -0,0 +1,91 @@
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
+DEFAULT_SKILLS_FILE = os.path.join(os.path.dirname(__file__), "data", "skills.txt")
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def load_skills(path: str) -> List[str]:
+    """Read one skill per line, skipping blank lines and # comments"""
+    skills = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                skills.append(line.lower())
+    return skills
+
+
+class SkillMatcher:
+    """
+    Finds every dictionary skill in a text in one pass.
+    Each skill is also matched with spaces or hyphens removed; a match
+    needs a word boundary on both sides, like r'\\b<skill>\\b'. Variants
+    are stored in a character trie that is walked from every word boundary
+    whose character can start a variant, so overlapping skills
+    ("react", "react native") are all reported.
+    """
+
+    def __init__(self, skills: Iterable[str]):
+        self._trie: Dict = {}
+        self.skills: List[str] = []
+        seen: Set[str] = set()
+        for skill in skills:
+            skill = skill.strip().lower()
+            if not skill or skill in seen:
+                continue
+            seen.add(skill)
+            self.skills.append(skill)
+            for variant in {skill, skill.replace(" ", ""), skill.replace("-", "")}:
+                self._add(variant, skill)
+
+        # Zero-width match at each boundary followed by a possible first character
+        first_chars = "".join(sorted(k for k in self._trie if k is not None))
+        self._starts = re.compile(r"\b(?=[" + re.escape(first_chars) + r"])") if first_chars else None
+
+    def _add(self, variant: str, skill: str):
+        node = self._trie
+        for ch in variant:
+            node = node.setdefault(ch, {})
+        node.setdefault(None, set()).add(skill)
+
+    @classmethod
+    def from_files(cls, paths: Iterable[Optional[str]]) -> "SkillMatcher":
+        skills: List[str] = []
+        for path in paths:
+            if path:
+                skills.extend(load_skills(path))
+        return cls(skills)
+
+    def find(self, text_lower: str) -> Set[str]:
+        """Canonical (dictionary) names of all skills found in lowercased text"""
+        found: Set[str] = set()
+        if self._starts is None:
+            return found
+        n = len(text_lower)
+        trie = self._trie
+        for start in self._starts.finditer(text_lower):
+            i = start.start()
+            node = trie
+            while i < n:
+                node = node.get(text_lower[i])
+                if node is None:
+                    break
+                i += 1
+                skills = node.get(None)
+                # Closing \b: word-ness changes between the last matched and the next char
+                if skills and _is_word(text_lower[i - 1]) != (i < n and _is_word(text_lower[i])):
+                    found.update(skills)
+        return found
+
+
+def build_default_matcher() -> SkillMatcher:
+    """SKILLS_FILE replaces the bundled dictionary; EXTRA_SKILLS_FILE adds to it"""
+    return SkillMatcher.from_files([
+        os.getenv("SKILLS_FILE") or DEFAULT_SKILLS_FILE,
+        os.getenv("EXTRA_SKILLS_FILE"),
+    ])
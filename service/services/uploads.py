@@ -0,0 +1,80 @@
+import hashlib
+import os
+import uuid
+from pathlib import Path
+from typing import Optional, Tuple
+
+from fastapi import UploadFile
+
+from .executors import run_blocking
+from .metrics import span
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, max_bytes: int):
+        super().__init__(f"File is larger than the {max_bytes} byte limit")
+        self.max_bytes = max_bytes
+
+
+def max_upload_bytes() -> int:
+    return int(os.getenv("RESUME_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+
+
+# Room for the multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def declared_size_too_large(content_length: Optional[str], max_bytes: int) -> bool:
+    """
+    Whether a request's Content-Length alone rules out a file within max_bytes;
+    checked before the multipart body is read. Chunked requests (no header)
+    are left to spool_upload.
+    """
+    try:
+        return int(content_length) > max_bytes + MULTIPART_OVERHEAD_BYTES
+    except (TypeError, ValueError):
+        return False
+
+
+def unique_upload_path(directory: Path, filename: str) -> Path:
+    """Per-upload file name, so same-named concurrent uploads don't collide"""
+    return Path(directory) / f"{uuid.uuid4().hex}{Path(filename or '').suffix.lower()}"
+
+
+def file_sha256(path: str, chunk_size: int = UPLOAD_CHUNK_SIZE) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+async def spool_upload(upload: UploadFile, path: Path, max_bytes: int,
+                       chunk_size: int = UPLOAD_CHUNK_SIZE) -> Tuple[int, str]:
+    """
+    Stream an upload to path in chunks, never holding the whole file in memory
+    Raises UploadTooLarge (and removes the partial file) past max_bytes
+    Returns the number of bytes written and their sha256 hex digest
+    """
+    with span("upload.save"):
+        size = 0
+        digest = hashlib.sha256()
+        f = await run_blocking(open, path, "wb")
+        try:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                digest.update(chunk)
+                await run_blocking(f.write, chunk)
+        except BaseException:
+            f.close()
+            path.unlink(missing_ok=True)
+            raise
+        await run_blocking(f.close)
+        return size, digest.hexdigest()
@@ -1,108 +1,239 @@
-from pinecone import Pinecone, ServerlessSpec
-from sentence_transformers import SentenceTransformer
+import logging
 import os
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional
+from .embedding_cache import EmbeddingCache, normalize_text
+from .embedding_model import LazyEmbeddingModel
+from .lexical_index import LexicalIndex
+from .metrics import span, timed
+from .search_filters import FILTER_FIELDS, normalized_fields
+from .vector_index import LocalVectorIndex, PineconeIndex
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIMENSION = 384
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# Profile fields the lexical index is built from
+LEXICAL_PROFILE_FIELDS = ['user_id', 'skills', 'experience', 'education', 'years_of_experience']
+
+
+def create_embedding_model() -> LazyEmbeddingModel:
+    """Embedding model for EMBEDDING_BACKEND; nothing is loaded until first use"""
+    return LazyEmbeddingModel(EMBEDDING_MODEL_NAME, os.getenv("EMBEDDING_BACKEND", "torch").lower())
+
+
+def create_vector_index():
+    """Pick the index backend from VECTOR_DB_BACKEND (pinecone | local)"""
+    backend = os.getenv("VECTOR_DB_BACKEND", "pinecone").lower()
+    
+    if backend == "local":
+        return LocalVectorIndex(
+            path=os.getenv("LOCAL_VECTOR_INDEX_PATH", "data/vector_index") or None,
+            dimension=EMBEDDING_DIMENSION,
+            ivf_lists=int(os.getenv("LOCAL_VECTOR_IVF_LISTS", "0")),
+            nprobe=int(os.getenv("LOCAL_VECTOR_IVF_NPROBE", "8")),
+        )
+    
+    if backend != "pinecone":
+        raise ValueError(f"Unknown VECTOR_DB_BACKEND: {backend}")
+    
+    return PineconeIndex(os.getenv("PINECONE_INDEX_NAME", "spherical-candidates"), EMBEDDING_DIMENSION)
+
 
 class VectorDB:
-    def __init__(self):
-        # Initialize Pinecone
-        pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
-        
-        self.index_name = os.getenv("PINECONE_INDEX_NAME", "spherical-candidates")
-        
+    def __init__(self, index=None, model: Optional[LazyEmbeddingModel] = None):
         # Use best model for semantic matching
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Loaded on first encode or warm_up(); EMBEDDING_BACKEND picks the CPU runtime
+        self.model = model if model is not None else create_embedding_model()
+        backend = self.model.backend
+        
+        # Identical queries and unchanged profiles are never re-encoded;
+        # other backends give slightly different vectors, so they get their own keys
+        self.embedding_cache = EmbeddingCache(
+            EMBEDDING_MODEL_NAME if backend == "torch" else f"{EMBEDDING_MODEL_NAME}:{backend}",
+            EMBEDDING_DIMENSION,
+            maxsize=int(os.getenv("EMBEDDING_CACHE_SIZE", "4096")),
+            disk_path=os.getenv("EMBEDDING_CACHE_PATH") or None,
+            disk_max_entries=int(os.getenv("EMBEDDING_CACHE_DISK_MAX_ENTRIES", "1000000")),
+        )
         
-        # Create index if it doesn't exist
-        existing_indexes = [index.name for index in pc.list_indexes()]
+        self.encode_batch_size = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+        self.upsert_batch_size = int(os.getenv("VECTOR_UPSERT_BATCH_SIZE", "100"))
         
-        if self.index_name not in existing_indexes:
-            pc.create_index(
-                name=self.index_name,
-                dimension=384,
-                metric="cosine",
-                spec=ServerlessSpec(
-                    cloud="aws",
-                    region=os.getenv("PINECONE_ENVIRONMENT", "us-east-1")
-                )
-            )
+        # Creating a Pinecone index talks to the network; the API builds it
+        # during startup and passes it in
+        self.index = index if index is not None else create_vector_index()
+        
+        # Skill postings + BM25 over what this process has written or loaded
+        self.lexical_index = LexicalIndex()
         
-        self.index = pc.Index(self.index_name)
+        # Bumped on every upsert; search result caches key on it
+        self.version = 0
     
     def create_embedding(self, text: str) -> List[float]:
         """Generate embedding from text"""
-        if not text or len(text.strip()) == 0:
-            text = "no data"
-        return self.model.encode(text, normalize_embeddings=True).tolist()
+        return self.create_embeddings([text])[0]
+    
+    @timed("embedding.create")
+    def create_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for many texts
+        Cache misses are encoded together in one batched model call
+        The cache holds float32 arrays; callers get plain lists
+        """
+        texts = [normalize_text(text or "") or "no data" for text in texts]
+        
+        embeddings = [self.embedding_cache.get(text) for text in texts]
+        missing = list(dict.fromkeys(
+            text for text, embedding in zip(texts, embeddings) if embedding is None
+        ))
+        
+        if missing:
+            with span("embedding.encode"):
+                encoded = self.model.encode(
+                    missing,
+                    batch_size=self.encode_batch_size,
+                    normalize_embeddings=True
+                )
+            fresh = {
+                text: self.embedding_cache.set(text, embedding)
+                for text, embedding in zip(missing, encoded)
+            }
+            embeddings = [
+                embedding if embedding is not None else fresh[text]
+                for text, embedding in zip(texts, embeddings)
+            ]
+        
+        return [embedding.tolist() for embedding in embeddings]
+    
+    def build_candidate_vectors(self, profiles: Dict[str, Dict]) -> List[Dict]:
+        """Turn {user_id: profile} into index records, encoding all texts in one batch"""
+        user_ids = list(profiles)
+        embeddings = self.create_embeddings(
+            [build_candidate_text(profiles[user_id]) for user_id in user_ids]
+        )
+        return [
+            {
+                "id": user_id,
+                "values": embedding,
+                "metadata": build_candidate_metadata(profiles[user_id])
+            }
+            for user_id, embedding in zip(user_ids, embeddings)
+        ]
+    
+    def upsert_vectors(self, vectors: List[Dict]):
+        """Write index records in chunked bulk requests"""
+        for start in range(0, len(vectors), self.upsert_batch_size):
+            with span("vector.upsert"):
+                self.index.upsert(vectors=vectors[start:start + self.upsert_batch_size])
+        for vector in vectors:
+            self._index_lexical(vector["id"], vector.get("metadata") or {})
+        if vectors:
+            self.version += 1
+    
+    def _index_lexical(self, user_id: str, metadata: Dict):
+        # Filter fields ride along so filtered skill queries can be narrowed locally
+        self.lexical_index.upsert(
+            user_id, metadata.get("skills", ""), metadata.get("experience", ""),
+            {field: metadata[field] for field in FILTER_FIELDS if field in metadata}
+        )
+    
+    def load_lexical_index(self, profiles: Iterable[Dict]) -> int:
+        """
+        Fill the lexical index from stored profiles (done once at startup)
+        Returns the number of candidates indexed
+        """
+        count = 0
+        for profile in profiles:
+            self._index_lexical(profile["user_id"], build_candidate_metadata(profile))
+            count += 1
+        logger.info("Lexical index loaded with %d candidates", count)
+        return count
+    
+    def upsert_candidates(self, profiles: Dict[str, Dict]) -> int:
+        """
+        Store many candidates in vector DB
+        Returns the number of candidates written
+        """
+        vectors = self.build_candidate_vectors(profiles)
+        self.upsert_vectors(vectors)
+        return len(vectors)
     
     def upsert_candidate(self, user_id: str, profile_data: Dict):
         """
         Store candidate in vector DB
         Combine all relevant fields for better matching
         """
-        # Create comprehensive text representation
-        text_parts = []
-        
-        if profile_data.get('skills'):
-            text_parts.append(f"Skills: {profile_data['skills']}")
-        
-        if profile_data.get('experience'):
-            text_parts.append(f"Experience: {profile_data['experience']}")
-        
-        if profile_data.get('education'):
-            text_parts.append(f"Education: {profile_data['education']}")
-        
-        if profile_data.get('years_of_experience'):
-            text_parts.append(f"Years: {profile_data['years_of_experience']}")
-        
-        # Add raw text for comprehensive matching
-        if profile_data.get('raw_text'):
-            text_parts.append(profile_data['raw_text'][:2000])  # First 2000 chars
-        
-        combined_text = " | ".join(text_parts)
-        
-        # Generate embedding
-        embedding = self.create_embedding(combined_text)
-        
-        # Prepare metadata (only store important fields, not full text)
-        metadata = {
-            "skills": profile_data.get('skills', '')[:1000],  # Pinecone metadata limit
-            "experience": profile_data.get('experience', '')[:500],
-            "education": profile_data.get('education', '')[:500],
-            "email": profile_data.get('email', ''),
-            "years_exp": profile_data.get('years_of_experience', '')
-        }
-        
-        # Upsert to Pinecone
-        self.index.upsert(
-            vectors=[
-                {
-                    "id": user_id,
-                    "values": embedding,
-                    "metadata": metadata
-                }
-            ]
-        )
+        self.upsert_candidates({user_id: profile_data})
         
-        print(f"✅ Candidate {user_id} stored in vector DB")
+        logger.info("Candidate %s stored in vector DB", user_id)
     
-    def search(self, query: str, top_k: int = 10) -> List[Dict]:
+    def search(self, query: str, top_k: int = 10, filter: Optional[Dict] = None) -> List[Dict]:
         """
         Search for candidates based on query
-        Returns candidates with similarity scores
+        Returns candidates with similarity scores; filter (see search_filters)
+        is applied by the index before top_k
         """
         # Generate query embedding
         query_embedding = self.create_embedding(query)
         
-        # Search in Pinecone
-        results = self.index.query(
-            vector=query_embedding,
-            top_k=top_k,
-            include_metadata=True
-        )
-        
-        matches = results.get('matches', [])
+        # Search in the vector index
+        with span("vector.query"):
+            matches = self.index.query(query_embedding, top_k=top_k, filter=filter)
         
-        print(f"🔍 Found {len(matches)} matches for query: '{query}'")
+        logger.debug("Found %d matches for query: %r", len(matches), query)
         
-        return matches
\ No newline at end of file
+        return matches
+    
+    def similarities(self, query: str, user_ids: List[str], filter: Optional[Dict] = None) -> Dict[str, float]:
+        """Vector similarity of query to specific candidates, keyed by user_id; filtered out ones are left out"""
+        if not user_ids:
+            return {}
+        query_embedding = self.create_embedding(query)
+        with span("vector.fetch"):
+            return self.index.fetch_scores(query_embedding, user_ids, filter=filter)
+    
+    def search_many(self, queries: List[str], top_k: int = 10) -> List[List[Dict]]:
+        """Search for several queries at once, one match list per query"""
+        if not queries:
+            return []
+        query_embeddings = self.create_embeddings(queries)
+        with span("vector.query"):
+            return self.index.query_many(query_embeddings, top_k=top_k)
+
+
+def build_candidate_text(profile_data: Dict) -> str:
+    """Combine all relevant profile fields into the text that gets embedded"""
+    # Create comprehensive text representation
+    text_parts = []
+    
+    if profile_data.get('skills'):
+        text_parts.append(f"Skills: {profile_data['skills']}")
+    
+    if profile_data.get('experience'):
+        text_parts.append(f"Experience: {profile_data['experience']}")
+    
+    if profile_data.get('education'):
+        text_parts.append(f"Education: {profile_data['education']}")
+    
+    if profile_data.get('years_of_experience'):
+        text_parts.append(f"Years: {profile_data['years_of_experience']}")
+    
+    # Add raw text for comprehensive matching
+    if profile_data.get('raw_text'):
+        text_parts.append(profile_data['raw_text'][:2000])  # First 2000 chars
+    
+    return " | ".join(text_parts)
+
+
+def build_candidate_metadata(profile_data: Dict) -> Dict:
+    """Prepare metadata (only store important fields, not full text)"""
+    return {
+        "skills": profile_data.get('skills', '')[:1000],  # Pinecone metadata limit
+        "experience": profile_data.get('experience', '')[:500],
+        "education": profile_data.get('education', '')[:500],
+        "email": profile_data.get('email', ''),
+        "years_exp": profile_data.get('years_of_experience', ''),
+        # skills_list, years_exp_num, education_rank: targets of search filters
+        **normalized_fields(profile_data)
+    }
@@ -0,0 +1,365 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .search_filters import matches_filter
+
+
+class PineconeIndex:
+    """Vector index backed by a remote Pinecone index"""
+
+    def __init__(self, index_name: str, dimension: int):
+        from pinecone import Pinecone, ServerlessSpec
+
+        pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+
+        # Create index if it doesn't exist
+        existing_indexes = [index.name for index in pc.list_indexes()]
+
+        if index_name not in existing_indexes:
+            pc.create_index(
+                name=index_name,
+                dimension=dimension,
+                metric="cosine",
+                spec=ServerlessSpec(
+                    cloud="aws",
+                    region=os.getenv("PINECONE_ENVIRONMENT", "us-east-1")
+                )
+            )
+
+        self.index = pc.Index(index_name)
+
+    def upsert(self, vectors: List[Dict]):
+        self.index.upsert(vectors=vectors)
+
+    def query(self, vector: List[float], top_k: int = 10, filter: Optional[Dict] = None) -> List[Dict]:
+        results = self.index.query(
+            vector=vector,
+            top_k=top_k,
+            include_metadata=True,
+            filter=filter
+        )
+        return results.get('matches', [])
+
+    def query_many(self, vectors: List[List[float]], top_k: int = 10) -> List[List[Dict]]:
+        return [self.query(vector, top_k=top_k) for vector in vectors]
+
+    def fetch_scores(self, vector: List[float], ids: List[str], filter: Optional[Dict] = None) -> Dict[str, float]:
+        """Cosine similarity of vector to the stored records with these ids (and matching filter)"""
+        q = np.asarray(vector, dtype=np.float32)
+        scores: Dict[str, float] = {}
+        # Ids travel in the query string, so keep each request small
+        for start in range(0, len(ids), 100):
+            response = self.index.fetch(ids=ids[start:start + 100])
+            for key, record in response.vectors.items():
+                if not matches_filter(record.metadata or {}, filter):
+                    continue
+                values = np.asarray(record.values, dtype=np.float32)
+                norm = float(np.linalg.norm(values)) * float(np.linalg.norm(q))
+                scores[key] = float(values @ q) / norm if norm else 0.0
+        return scores
+
+
+class MemmapVectorStore:
+    """
+    Append-only float32 matrix with a key -> row table.
+    With a path the matrix is a memory-mapped file and every write is
+    appended to a JSON-lines log, so the store survives restarts.
+    Without a path everything lives in memory.
+    """
+
+    VECTORS_FILE = "vectors.f32"
+    KEYS_FILE = "keys.jsonl"
+
+    def __init__(self, path: Optional[str], dimension: int, initial_capacity: int = 1024):
+        self.path = path
+        self.dimension = dimension
+        self.keys: List[str] = []
+        self.metadata: List[Dict] = []
+        self.rows: Dict[str, int] = {}
+        self._log = None
+        self._log_records = 0
+
+        if path:
+            os.makedirs(path, exist_ok=True)
+            self._load()
+            capacity = max(initial_capacity, len(self.keys))
+            self._open_matrix(capacity)
+            self._log = open(os.path.join(path, self.KEYS_FILE), "a", encoding="utf-8")
+            if self._log_records > 2 * max(1, len(self.keys)):
+                self.compact()
+        else:
+            self._matrix = np.zeros((initial_capacity, dimension), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """View over the rows that are in use"""
+        return self._matrix[:len(self.keys)]
+
+    def _load(self):
+        keys_path = os.path.join(self.path, self.KEYS_FILE)
+        if not os.path.exists(keys_path):
+            return
+        with open(keys_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn write from a crash, everything after it is unreliable
+                    break
+                self._log_records += 1
+                row = record["row"]
+                if row == len(self.keys):
+                    self.keys.append(record["key"])
+                    self.metadata.append(record.get("metadata") or {})
+                elif row < len(self.keys):
+                    self.metadata[row] = record.get("metadata") or {}
+                else:
+                    break
+                self.rows[record["key"]] = row
+
+    def _open_matrix(self, capacity: int):
+        vectors_path = os.path.join(self.path, self.VECTORS_FILE)
+        size = capacity * self.dimension * 4
+        with open(vectors_path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        capacity = os.path.getsize(vectors_path) // (self.dimension * 4)
+        self._matrix = np.memmap(vectors_path, dtype=np.float32, mode="r+",
+                                 shape=(capacity, self.dimension))
+
+    def _ensure_capacity(self, rows: int):
+        capacity = self._matrix.shape[0]
+        if rows <= capacity:
+            return
+        new_capacity = max(rows, capacity * 2)
+        if self.path:
+            self._matrix.flush()
+            del self._matrix
+            self._open_matrix(new_capacity)
+        else:
+            grown = np.zeros((new_capacity, self.dimension), dtype=np.float32)
+            grown[:capacity] = self._matrix
+            self._matrix = grown
+
+    def put_many(self, items: List[Dict]) -> List[int]:
+        """Write {"key", "values", "metadata"} items, returns their rows"""
+        new_keys = sum(1 for item in items if item["key"] not in self.rows)
+        self._ensure_capacity(len(self.keys) + new_keys)
+
+        rows = []
+        log_lines = []
+        for item in items:
+            key = item["key"]
+            metadata = item.get("metadata") or {}
+            row = self.rows.get(key)
+            if row is None:
+                row = len(self.keys)
+                self.keys.append(key)
+                self.metadata.append(metadata)
+                self.rows[key] = row
+            else:
+                self.metadata[row] = metadata
+            self._matrix[row] = np.asarray(item["values"], dtype=np.float32)
+            rows.append(row)
+            if self._log is not None:
+                log_lines.append(json.dumps({"key": key, "row": row, "metadata": metadata}))
+
+        if self._log is not None and log_lines:
+            # Vectors hit the file before the log entry that makes them visible
+            self._matrix.flush()
+            self._log.write("\n".join(log_lines) + "\n")
+            self._log.flush()
+            self._log_records += len(log_lines)
+        return rows
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self.rows.get(key)
+        if row is None:
+            return None
+        return np.array(self._matrix[row])
+
+    def compact(self):
+        """Rewrite the key log with a single record per row"""
+        if not self.path:
+            return
+        keys_path = os.path.join(self.path, self.KEYS_FILE)
+        tmp_path = keys_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for row, key in enumerate(self.keys):
+                f.write(json.dumps({"key": key, "row": row, "metadata": self.metadata[row]}) + "\n")
+        if self._log is not None:
+            self._log.close()
+        os.replace(tmp_path, keys_path)
+        self._log = open(keys_path, "a", encoding="utf-8")
+        self._log_records = len(self.keys)
+
+
+class LocalVectorIndex:
+    """
+    In-process cosine index over normalized embeddings.
+    Exact search is a single matrix-vector product; with ivf_lists > 0
+    large pools are partitioned with k-means and only the nprobe closest
+    partitions are scanned.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        dimension: int = 384,
+        ivf_lists: int = 0,
+        nprobe: int = 8,
+        ivf_min_rows: int = 10000,
+    ):
+        self.store = MemmapVectorStore(path, dimension)
+        self.dimension = dimension
+        self.ivf_lists = ivf_lists
+        self.nprobe = nprobe
+        self.ivf_min_rows = max(ivf_min_rows, ivf_lists)
+        self._lock = threading.RLock()
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        self._assignments: Dict[int, int] = {}
+        self._trained_rows = 0
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def upsert(self, vectors: List[Dict]):
+        items = [
+            {"key": v["id"], "values": v["values"], "metadata": v.get("metadata")}
+            for v in vectors
+        ]
+        with self._lock:
+            rows = self.store.put_many(items)
+            if self._centroids is not None:
+                self._assign_rows(rows)
+
+    def query(self, vector: List[float], top_k: int = 10, filter: Optional[Dict] = None) -> List[Dict]:
+        q = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            if not len(self.store):
+                return []
+            if filter:
+                # Filtered searches scan exactly the rows that pass the filter
+                candidates = np.asarray(
+                    [row for row, metadata in enumerate(self.store.metadata) if matches_filter(metadata, filter)],
+                    dtype=np.int64
+                )
+            else:
+                candidates = self._candidate_rows(q)
+            if candidates is None:
+                scores = self.store.matrix @ q
+                rows = None
+            else:
+                scores = self.store.matrix[candidates] @ q
+                rows = candidates
+            return self._top_k(scores, rows, top_k)
+
+    def query_many(self, vectors: List[List[float]], top_k: int = 10) -> List[List[Dict]]:
+        queries = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            if not len(self.store):
+                return [[] for _ in vectors]
+            if self.ivf_lists and len(self.store) >= self.ivf_min_rows:
+                return [self.query(q, top_k=top_k) for q in queries]
+            # One matrix-matrix product answers every query
+            scores = queries @ self.store.matrix.T
+            return [self._top_k(row_scores, None, top_k) for row_scores in scores]
+
+    def fetch_scores(self, vector: List[float], ids: List[str], filter: Optional[Dict] = None) -> Dict[str, float]:
+        """Similarity of vector to the stored rows with these ids (unknown or filtered out ids are left out)"""
+        q = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            known = [
+                key for key in ids
+                if key in self.store.rows and matches_filter(self.store.metadata[self.store.rows[key]], filter)
+            ]
+            if not known:
+                return {}
+            rows = [self.store.rows[key] for key in known]
+            scores = self.store.matrix[rows] @ q
+        return {key: float(score) for key, score in zip(known, scores)}
+
+    def _top_k(self, scores: np.ndarray, rows: Optional[np.ndarray], top_k: int) -> List[Dict]:
+        k = min(top_k, len(scores))
+        if k <= 0:
+            return []
+        if k < len(scores):
+            best = np.argpartition(-scores, k - 1)[:k]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind="stable")]
+
+        matches = []
+        for i in best:
+            row = int(rows[i]) if rows is not None else int(i)
+            matches.append({
+                "id": self.store.keys[row],
+                "score": float(scores[i]),
+                "metadata": self.store.metadata[row],
+            })
+        return matches
+
+    # --- IVF partitioning ---
+    def _candidate_rows(self, q: np.ndarray) -> Optional[np.ndarray]:
+        """Rows to scan for q, or None for an exhaustive scan"""
+        if not self.ivf_lists or len(self.store) < self.ivf_min_rows:
+            return None
+        if self._centroids is None or len(self.store) > 2 * self._trained_rows:
+            self._train()
+
+        probe = np.argsort(-(self._centroids @ q))[:self.nprobe]
+        rows = [self._lists[c] for c in probe if self._lists[c]]
+        if not rows:
+            return None
+        return np.concatenate([np.asarray(r, dtype=np.int64) for r in rows])
+
+    def _train(self, iterations: int = 10):
+        """Spherical k-means over a sample of the stored vectors"""
+        matrix = self.store.matrix
+        n = len(matrix)
+        rng = np.random.default_rng(0)
+        sample_size = min(n, self.ivf_lists * 256)
+        sample = matrix[rng.choice(n, size=sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, size=self.ivf_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(self.ivf_lists):
+                members = sample[labels == c]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    norm = np.linalg.norm(centroid)
+                    if norm > 0:
+                        centroids[c] = centroid / norm
+
+        self._centroids = centroids
+        self._lists = [[] for _ in range(self.ivf_lists)]
+        self._assignments = {}
+        self._assign_rows(range(n))
+        self._trained_rows = n
+
+    def _assign_rows(self, rows):
+        rows = list(rows)
+        if not rows:
+            return
+        labels = np.argmax(self.store.matrix[rows] @ self._centroids.T, axis=1)
+        for row, label in zip(rows, labels):
+            label = int(label)
+            previous = self._assignments.get(row)
+            if previous == label:
+                continue
+            if previous is not None:
+                self._lists[previous].remove(row)
+            self._lists[label].append(row)
+            self._assignments[row] = label